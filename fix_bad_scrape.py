@@ -6,6 +6,7 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
+from sqlalchemy import select, func
 from lotto_ai.core.db import init_db, get_session, Draw
 from lotto_ai.scraper.serbia_scraper import remove_bad_draws
 
@@ -18,24 +19,33 @@ bad_dates = [
     '2026-02-27',  # Instant lottery (kolo 2, multiple extractions)
 ]
 
-print("Current latest draws:")
+
+def show_latest(session, limit=10):
+    """Print the latest draws; returns the total draw count (one query)"""
+    stmt = (
+        select(Draw, func.count().over().label('total'))
+        .order_by(Draw.draw_date.desc())
+        .limit(limit)
+    )
+    rows = session.execute(stmt).all()
+    lines = []
+    for d, _ in rows:
+        kolo = f" (kolo {d.round_number})" if d.round_number else ""
+        lines.append(f"  {d.draw_date}{kolo}: {d.get_numbers()}")
+    print("\n".join(lines))
+    return rows[0].total if rows else 0
+
+
 session = get_session()
-draws = session.query(Draw).order_by(Draw.draw_date.desc()).limit(10).all()
-for d in draws:
-    kolo = f" (kolo {d.round_number})" if d.round_number else ""
-    print(f"  {d.draw_date}{kolo}: {d.get_numbers()}")
-session.close()
+
+print("Current latest draws:")
+show_latest(session)
 
 print(f"\nRemoving {len(bad_dates)} bad draws: {bad_dates}")
 removed = remove_bad_draws(bad_dates)
 print(f"Removed: {removed}")
 
 print("\nAfter fix:")
-session = get_session()
-draws = session.query(Draw).order_by(Draw.draw_date.desc()).limit(10).all()
-for d in draws:
-    kolo = f" (kolo {d.round_number})" if d.round_number else ""
-    print(f"  {d.draw_date}{kolo}: {d.get_numbers()}")
-total = session.query(Draw).count()
+total = show_latest(session)
 session.close()
 print(f"\nTotal draws: {total}")
\ No newline at end of file
@@ -2,25 +2,27 @@
 Generate predictions and save them for tracking
 Uses coverage-optimized portfolio generation
 """
-from datetime import datetime, timedelta
-from lotto_ai.features.features import build_feature_matrix, load_draws
-from lotto_ai.core.models import generate_optimized_portfolio
-from lotto_ai.core.coverage_optimizer import portfolio_statistics
-from lotto_ai.core.tracker import PredictionTracker
-from lotto_ai.core.learner import AdaptiveLearner
-from lotto_ai.config import DRAW_DAYS, logger
+import functools
+from datetime import date, timedelta
+from lotto_ai.config import NEXT_DRAW_DELTA
+
+
+@functools.lru_cache(maxsize=1)
+def _next_draw_for(today):
+    """Next draw strictly after `today` (cached per calendar day)"""
+    delta = NEXT_DRAW_DELTA[today.weekday()]
+    return (today + timedelta(days=delta)).strftime('%Y-%m-%d')
+
+
+@functools.lru_cache(maxsize=32)
+def _strategy_performance(tracker, strategy_name, window):
+    """Per-run cache of tracker aggregates; cleared when a prediction is saved"""
+    return tracker.get_strategy_performance(strategy_name, window=window)
 
 
 def get_next_draw_date():
     """Calculate next draw date using configured DRAW_DAYS"""
-    today = datetime.now()
-    days_ahead = 0
-
-    while True:
-        days_ahead += 1
-        next_date = today + timedelta(days=days_ahead)
-        if next_date.weekday() in DRAW_DAYS:
-            return next_date.strftime('%Y-%m-%d')
+    return _next_draw_for(date.today())
 
 
 def main():
@@ -28,6 +30,12 @@ def main():
     print("🎰 LOTO SRBIJA - SMART PORTFOLIO OPTIMIZER")
     print("=" * 70)
 
+    # Heavy imports (numpy/pandas/SQLAlchemy) are deferred until needed
+    from lotto_ai.core.models import generate_optimized_portfolio
+    from lotto_ai.core.coverage_optimizer import portfolio_statistics
+    from lotto_ai.core.tracker import PredictionTracker
+    from lotto_ai.core.learner import AdaptiveLearner
+
     tracker = PredictionTracker()
     learner = AdaptiveLearner()
 
@@ -45,7 +53,7 @@ def main():
 
     # Step 3: Performance stats
     print("\n📊 Korak 3: Trenutne performanse:")
-    perf = tracker.get_strategy_performance(window=50)
+    perf = _strategy_performance(tracker, 'coverage_v3', 50)
     if perf:
         print(f"   Poslednjih {perf['n_predictions']} predviđanja:")
         print(f"   • Prosečno pogodaka: {perf['avg_best_match']:.2f}/7")
@@ -74,34 +82,40 @@ def main():
         model_version='3.0_coverage_optimizer',
         metadata=metadata
     )
+    _strategy_performance.cache_clear()
 
     # Step 6: Display
     stats = portfolio_statistics(portfolio)
 
-    print("\n" + "=" * 70)
-    print("📦 PORTFOLIO STATISTIKE")
-    print("=" * 70)
-    print(f"  ID Predviđanja:     {prediction_id}")
-    print(f"  Ciljno izvlačenje:  {next_draw}")
-    print(f"  Ukupno tiketa:      {stats['total_tickets']}")
-    print(f"  Jedinstveni brojevi: {stats['unique_numbers']}/39 ({stats['number_coverage_pct']:.1f}%)")
-    print(f"  Pokrivenost parova: {stats['pair_coverage_pct']:.1f}%")
-    print(f"  Prosečno preklapanje: {stats['avg_overlap']:.2f}")
-    print(f"  Skor raznovrsnosti: {stats['diversity_score']:.3f}")
-    print(f"  P(bar 1 tiket 3+): {stats['p_at_least_one_3plus']:.1%}")
-
-    print("\n" + "=" * 70)
-    print("🎟️  VAŠI TIKETI (Coverage-Optimized)")
-    print("=" * 70)
+    lines = [
+        "",
+        "=" * 70,
+        "📦 PORTFOLIO STATISTIKE",
+        "=" * 70,
+        f"  ID Predviđanja:     {prediction_id}",
+        f"  Ciljno izvlačenje:  {next_draw}",
+        f"  Ukupno tiketa:      {stats['total_tickets']}",
+        f"  Jedinstveni brojevi: {stats['unique_numbers']}/39 ({stats['number_coverage_pct']:.1f}%)",
+        f"  Pokrivenost parova: {stats['pair_coverage_pct']:.1f}%",
+        f"  Prosečno preklapanje: {stats['avg_overlap']:.2f}",
+        f"  Skor raznovrsnosti: {stats['diversity_score']:.3f}",
+        f"  P(bar 1 tiket 3+): {stats['p_at_least_one_3plus']:.1%}",
+        "",
+        "=" * 70,
+        "🎟️  VAŠI TIKETI (Coverage-Optimized)",
+        "=" * 70,
+    ]
 
     for i, ticket in enumerate(portfolio, 1):
         ticket_str = ' '.join(f'{n:2d}' for n in ticket)
-        print(f"  Tiket {i:2d}: [{ticket_str}]")
-
-    print("\n" + "=" * 70)
-    print("📝 SLEDEĆI KORACI")
-    print("=" * 70)
-    print(f"""
+        lines.append(f"  Tiket {i:2d}: [{ticket_str}]")
+
+    lines += [
+        "",
+        "=" * 70,
+        "📝 SLEDEĆI KORACI",
+        "=" * 70,
+        f"""
   1. Odigrajte izabrane tikete za {next_draw}
   2. Posle izvlačenja, pokrenite ponovo za:
      • Evaluaciju predviđanja
@@ -112,8 +126,12 @@ def main():
   To znači da pokrivaju što više kombinacija,
   ali svaki tiket ima ISTU šansu kao nasumičan.
   Igrajte odgovorno!
-    """)
-    print("=" * 70)
+    """,
+        "=" * 70,
+    ]
+
+    # One write for the whole report instead of a flush per line
+    print("\n".join(lines))
 
 
 if __name__ == "__main__":
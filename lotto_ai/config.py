@@ -3,6 +3,7 @@ Configuration for Loto Serbia AI - v3.0
 """
 import os
 import logging
+import functools
 from pathlib import Path
 from math import comb
 
@@ -30,9 +31,15 @@ else:
     BASE_DIR = Path(__file__).parent.parent
     DATA_DIR = BASE_DIR / "data"
 
-DATA_DIR.mkdir(parents=True, exist_ok=True)
 DB_PATH = DATA_DIR / "loto_serbia.db"
 
+
+@functools.lru_cache(maxsize=None)
+def ensure_data_dir():
+    """Create DATA_DIR on first use instead of at import time"""
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    return DATA_DIR
+
 # ============================================================================
 # LOTTERY CONFIGURATION - SERBIA LOTO 7/39
 # ============================================================================
@@ -46,7 +53,12 @@ BONUS_MIN = None
 BONUS_MAX = None
 BONUS_RANGE = None
 
-DRAW_DAYS = [1, 4]  # Monday, Wednesday, Thursday
+DRAW_DAYS = [1, 4]  # Tuesday, Friday
+DRAW_DAYS_SET = frozenset(DRAW_DAYS)
+# Days from weekday wd (Mon=0) to the next draw strictly after that day
+NEXT_DRAW_DELTA = tuple(
+    min(((d - wd) % 7) or 7 for d in DRAW_DAYS) for wd in range(7)
+)
 DRAW_HOUR = 21
 DRAW_MINUTE = 0
 DRAW_TIMEZONE = "Europe/Belgrade"
@@ -54,7 +66,7 @@ DRAW_TIMEZONE = "Europe/Belgrade"
 GAME_NAME = "Loto 7/39"
 GAME_COUNTRY = "Serbia"
 GAME_ID = 1
-DRAWS_PER_WEEK = 3
+DRAWS_PER_WEEK = len(DRAW_DAYS)
 
 # ============================================================================
 # PRIZE TABLE (RSD)
@@ -73,18 +85,19 @@ TICKET_COST = 100
 # ============================================================================
 TOTAL_COMBINATIONS = comb(MAX_NUMBER, NUMBERS_PER_DRAW)  # 15,380,937
 
-def _calc_ev():
-    ev = 0.0
-    for k, prize in PRIZE_TABLE.items():
-        remaining = MAX_NUMBER - NUMBERS_PER_DRAW
-        needed = NUMBERS_PER_DRAW - k
-        if needed < 0 or needed > remaining:
-            continue
-        p = (comb(NUMBERS_PER_DRAW, k) * comb(remaining, needed)) / TOTAL_COMBINATIONS
-        ev += p * prize
-    return ev
+# P(exactly k matches) for k = 0..NUMBERS_PER_DRAW (hypergeometric)
+MATCH_PROBABILITIES = tuple(
+    comb(NUMBERS_PER_DRAW, k) * comb(MAX_NUMBER - NUMBERS_PER_DRAW, NUMBERS_PER_DRAW - k)
+    / TOTAL_COMBINATIONS
+    for k in range(NUMBERS_PER_DRAW + 1)
+)
 
-_EXPECTED_VALUE = _calc_ev()
+# Prize indexed by number of matches (0 where nothing is paid)
+PRIZE_BY_MATCHES = tuple(PRIZE_TABLE.get(k, 0) for k in range(NUMBERS_PER_DRAW + 1))
+
+EXPECTED_VALUE_PER_TICKET = sum(
+    p * prize for p, prize in zip(MATCH_PROBABILITIES, PRIZE_BY_MATCHES)
+)
 
 # ============================================================================
 # SCRAPING
@@ -111,11 +124,13 @@ WHEEL_GUARANTEE_DEFAULT = 3
 LOG_LEVEL = logging.DEBUG if not IS_CLOUD else logging.INFO
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 
-logging.basicConfig(
-    level=LOG_LEVEL,
-    format=LOG_FORMAT,
-    handlers=[logging.StreamHandler()]
-)
+# Leave logging alone if the host application already configured it
+if not logging.getLogger().handlers:
+    logging.basicConfig(
+        level=LOG_LEVEL,
+        format=LOG_FORMAT,
+        handlers=[logging.StreamHandler()]
+    )
 
 logger = logging.getLogger("lotto_ai.config")
 
@@ -124,7 +139,7 @@ logger.info(f"Data directory: {DATA_DIR}")
 logger.info(f"Database path: {DB_PATH}")
 logger.info(f"Number range: {NUMBER_RANGE}")
 logger.info(f"Total combinations: {TOTAL_COMBINATIONS:,}")
-logger.info(f"Expected value per ticket: {_EXPECTED_VALUE:.2f} RSD")
+logger.info(f"Expected value per ticket: {EXPECTED_VALUE_PER_TICKET:.2f} RSD")
 logger.info(f"Draw days: {DRAW_DAYS}")
 logger.info(f"Has bonus number: {HAS_BONUS}")
 if not SCRAPING_ENABLED:
@@ -2,12 +2,18 @@
 Bankroll management for responsible lottery play.
 Uses Kelly Criterion adaptation and responsible gambling limits.
 """
-from math import comb
+import numpy as np
 from lotto_ai.config import (
     logger, MATCH_PROBABILITIES, PRIZE_TABLE, TICKET_COST,
     EXPECTED_VALUE_PER_TICKET, NUMBERS_PER_DRAW, MAX_NUMBER,
     TOTAL_COMBINATIONS
 )
+from lotto_ai.core.bitmask import popcount, random_masks
+
+# Upper bound on random keys materialized per Monte Carlo chunk
+_MC_CHUNK_KEYS = 4_000_000
+
+_MATCH_PROBS = np.array(MATCH_PROBABILITIES)
 
 
 class BankrollManager:
@@ -19,27 +25,28 @@ class BankrollManager:
     def __init__(self, ticket_cost=None, prize_table=None):
         self.ticket_cost = ticket_cost or TICKET_COST
         self.prize_table = prize_table or PRIZE_TABLE
+        # Prize per match count, built once for EV and the simulations
+        self.prize_lut = np.array(
+            [self.prize_table.get(k, 0) for k in range(NUMBERS_PER_DRAW + 1)],
+            dtype=np.int64
+        )
 
     def calculate_expected_value(self):
         """
         Calculate exact expected value per ticket.
         """
-        ev = 0
+        ev = float(self.prize_lut @ _MATCH_PROBS)
         breakdown = {}
 
-        for k in range(NUMBERS_PER_DRAW + 1):
-            prob = MATCH_PROBABILITIES[k]
-            prize = self.prize_table.get(k, 0)
-            ev_contribution = prob * prize
-
+        for k, prob in enumerate(MATCH_PROBABILITIES):
+            prize = int(self.prize_lut[k])
             breakdown[k] = {
                 'matches': k,
                 'probability': prob,
                 'probability_1_in': 1 / prob if prob > 0 else float('inf'),
                 'prize': prize,
-                'ev_contribution': ev_contribution
+                'ev_contribution': prob * prize
             }
-            ev += ev_contribution
 
         roi = (ev - self.ticket_cost) / self.ticket_cost * 100
 
@@ -98,33 +105,28 @@ class BankrollManager:
         Monte Carlo simulation of long-term outcomes.
         Shows the realistic distribution of wins and losses.
         """
-        import numpy as np
         rng = np.random.default_rng(42)
 
         total_costs = n_tickets_per_draw * n_draws * self.ticket_cost
-        final_balances = []
-
-        all_numbers = list(range(1, MAX_NUMBER + 1))
-
-        for sim in range(n_simulations):
-            total_won = 0
 
-            for draw in range(n_draws):
-                # Simulate actual draw
-                drawn = set(rng.choice(all_numbers, size=NUMBERS_PER_DRAW, replace=False))
+        # Work is split into (simulations x draws) blocks so that peak memory
+        # stays bounded even when a single simulation is very large
+        keys_per_draw = (n_tickets_per_draw + 1) * MAX_NUMBER
+        draw_chunk = max(1, min(n_draws, _MC_CHUNK_KEYS // keys_per_draw))
+        sim_chunk = max(1, _MC_CHUNK_KEYS // (keys_per_draw * draw_chunk))
+        total_won = np.zeros(n_simulations, dtype=np.int64)
 
-                for ticket in range(n_tickets_per_draw):
-                    # Generate random ticket
-                    ticket_nums = set(rng.choice(
-                        all_numbers, size=NUMBERS_PER_DRAW, replace=False
-                    ))
-                    matches = len(ticket_nums & drawn)
-                    total_won += self.prize_table.get(matches, 0)
+        for start in range(0, n_simulations, sim_chunk):
+            n_sim = min(sim_chunk, n_simulations - start)
+            for d_start in range(0, n_draws, draw_chunk):
+                n_d = min(draw_chunk, n_draws - d_start)
+                drawn = random_masks(rng, (n_sim, n_d))
+                tickets = random_masks(rng, (n_sim, n_d, n_tickets_per_draw))
 
-            net = total_won - total_costs
-            final_balances.append(net)
+                matches = popcount(tickets & drawn[..., None])
+                total_won[start:start + n_sim] += self.prize_lut[matches].sum(axis=(1, 2))
 
-        final_balances = np.array(final_balances)
+        final_balances = total_won - total_costs
 
         return {
             'n_simulations': n_simulations,
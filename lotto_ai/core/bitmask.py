@@ -0,0 +1,69 @@
+"""
+Bitmask representation of tickets and draws.
+Number n is stored as bit (n - 1), so a 7/39 ticket fits in one uint64
+and the match count of two tickets is popcount(a & b).
+"""
+import numpy as np
+from lotto_ai.config import MAX_NUMBER, NUMBERS_PER_DRAW, PRIZE_BY_MATCHES
+
+# Bit value of each number 1..MAX_NUMBER
+NUMBER_BITS = np.uint64(1) << np.arange(MAX_NUMBER, dtype=np.uint64)
+
+# Prize in RSD indexed by match count, so prizes = PRIZE_LUT[matches]
+PRIZE_LUT = np.array(PRIZE_BY_MATCHES, dtype=np.int64)
+
+_POPCOUNT_LUT = np.array([bin(i).count('1') for i in range(1 << 16)], dtype=np.uint8)
+
+# Process-wide PCG64 stream shared by all unseeded sampling
+_RNG = np.random.default_rng()
+
+
+def get_rng(seed=None):
+    """Shared generator when seed is None, else a Generator for seed (int or Generator)"""
+    return _RNG if seed is None else np.random.default_rng(seed)
+
+
+def mask_from_ticket(nums):
+    """Ticket numbers -> int bitmask"""
+    mask = 0
+    for n in nums:
+        mask |= 1 << (int(n) - 1)
+    return mask
+
+
+def ticket_from_mask(mask):
+    """Int bitmask -> sorted ticket numbers"""
+    mask = int(mask)
+    return [i + 1 for i in range(MAX_NUMBER) if mask >> i & 1]
+
+
+def masks_from_tickets(tickets):
+    """List of tickets -> uint64 array of shape (n_tickets,)"""
+    return np.array([mask_from_ticket(t) for t in tickets], dtype=np.uint64)
+
+
+def presence_matrix(draws):
+    """(n_draws, MAX_NUMBER) bool matrix; column n-1 marks draws containing n"""
+    draws = np.asarray(draws)
+    presence = np.zeros((len(draws), MAX_NUMBER), dtype=bool)
+    presence[np.arange(len(draws))[:, None], draws - 1] = True
+    return presence
+
+
+def popcount(masks):
+    """Number of set bits in each element of a uint64 array"""
+    masks = np.asarray(masks, dtype=np.uint64)
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(masks)
+    low = np.uint64(0xFFFF)
+    return (_POPCOUNT_LUT[masks & low]
+            + _POPCOUNT_LUT[(masks >> np.uint64(16)) & low]
+            + _POPCOUNT_LUT[(masks >> np.uint64(32)) & low])
+
+
+def random_masks(rng, shape, k=NUMBERS_PER_DRAW):
+    """Sample k distinct numbers per cell of `shape`, returned as masks"""
+    keys = rng.random(tuple(shape) + (MAX_NUMBER,), dtype=np.float32)
+    picked = np.argpartition(keys, k, axis=-1)[..., :k]
+    # Bits are distinct, so summing them is the same as OR-ing them
+    return NUMBER_BITS[picked].sum(axis=-1, dtype=np.uint64)
@@ -4,17 +4,39 @@ Maximizes pair/triple coverage across tickets.
 This is mathematically legitimate optimization.
 """
 import numpy as np
-import random
 import itertools
-from collections import Counter
+import functools
+from math import comb
 from lotto_ai.config import (
     MIN_NUMBER, MAX_NUMBER, NUMBERS_PER_DRAW, logger
 )
+from lotto_ai.core.bitmask import get_rng
+
+
+@functools.lru_cache(maxsize=None)
+def _ticket_combo_index(n_numbers):
+    """Positions of every pair and triple within a sorted ticket of n_numbers"""
+    pair_idx = np.triu_indices(n_numbers, k=1)
+    triple_idx = tuple(np.array(
+        list(itertools.combinations(range(n_numbers), 3)), dtype=np.intp
+    ).reshape(-1, 3).T)
+    return pair_idx, triple_idx
+
+
+def _triple_ranks(tickets, triple_idx):
+    """
+    Combinatorial-number-system rank C(k,3) + C(j,2) + i of every i<j<k
+    triple in each sorted ticket row; ranks index a flat covered-triples bitset.
+    """
+    # Binomials are taken per number first, then gathered per triple
+    c2 = tickets * (tickets - 1) // 2
+    c3 = c2 * (tickets - 2) // 3
+    return c3[:, triple_idx[2]] + c2[:, triple_idx[1]] + tickets[:, triple_idx[0]]
 
 
 def optimize_portfolio_coverage(n_tickets, n_numbers=NUMBERS_PER_DRAW,
                                  min_num=MIN_NUMBER, max_num=MAX_NUMBER,
-                                 monte_carlo_samples=None):
+                                 monte_carlo_samples=None, seed=None):
     """
     Generate tickets that MINIMIZE overlap and MAXIMIZE number pair coverage.
 
@@ -26,6 +48,7 @@ def optimize_portfolio_coverage(n_tickets, n_numbers=NUMBERS_PER_DRAW,
         min_num: Minimum number (1)
         max_num: Maximum number (39)
         monte_carlo_samples: Candidates evaluated per greedy step
+        seed: Optional seed or Generator for candidate sampling
 
     Returns:
         portfolio: List of sorted ticket lists
@@ -34,165 +57,170 @@ def optimize_portfolio_coverage(n_tickets, n_numbers=NUMBERS_PER_DRAW,
     if monte_carlo_samples is None:
         monte_carlo_samples = 1500
 
-    all_numbers = list(range(min_num, max_num + 1))
-    portfolio = []
-    covered_pairs = set()
-    covered_triples = set()
+    rng = get_rng(seed)
+    portfolio = np.empty((n_tickets, n_numbers), dtype=np.int8)
 
-    total_possible_pairs = 0
-    for i in range(min_num, max_num + 1):
-        for j in range(i + 1, max_num + 1):
-            total_possible_pairs += 1
+    # Coverage is tracked as dense 0/1 tables indexed by the numbers themselves
+    size = max_num + 1
+    covered_pairs = np.zeros((size, size), dtype=np.uint8)
+    covered_triples = np.zeros(comb(size, 3), dtype=np.uint8)
+    membership = np.zeros((n_tickets, size), dtype=bool)
+
+    pair_idx, triple_idx = _ticket_combo_index(n_numbers)
+    expected_sum = n_numbers * (min_num + max_num) / 2
+    sum_tolerance = 0.3 * expected_sum
+    total_possible_pairs = comb(max_num - min_num + 1, 2)
+    total_possible_triples = comb(max_num - min_num + 1, 3)
+    n_pairs_covered = n_triples_covered = 0
 
     logger.debug(f"Coverage optimizer: {n_tickets} tickets, "
                  f"{total_possible_pairs} possible pairs")
 
     for ticket_idx in range(n_tickets):
-        best_ticket = None
-        best_score = -1
-
-        for _ in range(monte_carlo_samples):
-            candidate = sorted(random.sample(all_numbers, n_numbers))
-
-            # Calculate pairs this candidate covers
-            candidate_pairs = set()
-            for i in range(len(candidate)):
-                for j in range(i + 1, len(candidate)):
-                    candidate_pairs.add((candidate[i], candidate[j]))
-
-            # Calculate triples
-            candidate_triples = set()
-            for i in range(len(candidate)):
-                for j in range(i + 1, len(candidate)):
-                    for k in range(j + 1, len(candidate)):
-                        candidate_triples.add(
-                            (candidate[i], candidate[j], candidate[k])
-                        )
-
-            new_pairs = len(candidate_pairs - covered_pairs)
-            new_triples = len(candidate_triples - covered_triples)
-
-            # Penalize heavy overlap with existing tickets
-            overlap_penalty = 0
-            for existing in portfolio:
-                overlap = len(set(candidate) & set(existing))
-                if overlap >= 5:
-                    overlap_penalty += (overlap - 4) * 3
-
-            score = new_pairs + 0.3 * new_triples - overlap_penalty
-
-            # Balance: prefer 2-5 odd numbers
-            odd_count = sum(1 for n in candidate if n % 2 == 1)
-            if not (2 <= odd_count <= 5):
-                score -= 5
-
-            # Sum range: avoid extreme sums
-            ticket_sum = sum(candidate)
-            expected_sum = n_numbers * (min_num + max_num) / 2
-            sum_deviation = abs(ticket_sum - expected_sum) / expected_sum
-            if sum_deviation > 0.3:
-                score -= 3
-
-            if score > best_score:
-                best_score = score
-                best_ticket = candidate
-
-        if best_ticket is None:
-            best_ticket = sorted(random.sample(all_numbers, n_numbers))
-
-        portfolio.append(best_ticket)
-
-        # Update covered sets
-        for i in range(len(best_ticket)):
-            for j in range(i + 1, len(best_ticket)):
-                covered_pairs.add((best_ticket[i], best_ticket[j]))
-                for k in range(j + 1, len(best_ticket)):
-                    covered_triples.add(
-                        (best_ticket[i], best_ticket[j], best_ticket[k])
-                    )
-
-        logger.debug(f"Ticket {ticket_idx + 1}: {best_ticket} | "
-                     f"Pairs covered: {len(covered_pairs)}/{total_possible_pairs}")
+        cands = _sample_tickets(rng, monte_carlo_samples, n_numbers, min_num, max_num)
+
+        scores = _score_candidates(
+            cands, covered_pairs, covered_triples, membership[:ticket_idx],
+            pair_idx, triple_idx, expected_sum, sum_tolerance,
+            score_pairs=n_pairs_covered < total_possible_pairs,
+            score_triples=n_triples_covered < total_possible_triples
+        )
+
+        best = int(np.argmax(scores)) if len(scores) else -1
+        if best >= 0 and scores[best] > -1:
+            c = cands[best]
+        else:
+            c = _sample_tickets(rng, 1, n_numbers, min_num, max_num)[0]
+
+        portfolio[ticket_idx] = c
+
+        # Update coverage tables
+        covered_pairs[c[pair_idx[0]], c[pair_idx[1]]] = 1
+        covered_triples[_triple_ranks(c[None, :], triple_idx)] = 1
+        membership[ticket_idx, c] = True
+        n_pairs_covered = int(covered_pairs.sum())
+        n_triples_covered = int(covered_triples.sum())
+
+        logger.debug(f"Ticket {ticket_idx + 1}: {c.tolist()} | "
+                     f"Pairs covered: {n_pairs_covered}/{total_possible_pairs}")
 
     coverage_stats = _calculate_coverage_stats(
-        portfolio, covered_pairs, covered_triples,
+        portfolio, n_pairs_covered, n_triples_covered,
         total_possible_pairs, max_num
     )
 
     logger.info(f"Generated {n_tickets} coverage-optimized tickets | "
                 f"Pair coverage: {coverage_stats['pair_coverage_pct']:.1f}%")
 
-    return portfolio, coverage_stats
+    return portfolio.tolist(), coverage_stats
 
 
-def _calculate_coverage_stats(portfolio, covered_pairs, covered_triples,
+def _score_candidates(cands, covered_pairs, covered_triples, existing,
+                      pair_idx, triple_idx, expected_sum, sum_tolerance,
+                      score_pairs=True, score_triples=True,
+                      odd_range=(2, 5)):
+    """
+    Greedy score of every candidate row in `cands` (higher is better).
+    Pure array function: reads the coverage tables, writes nothing.
+    Once a table is saturated its novelty term is always 0, so callers can
+    pass score_pairs/score_triples=False to skip the gather.
+    """
+    new_pairs = new_triples = 0
+    if score_pairs:
+        pair_i, pair_j = pair_idx
+        new_pairs = (covered_pairs[cands[:, pair_i], cands[:, pair_j]] == 0).sum(axis=1)
+    if score_triples:
+        new_triples = (
+            covered_triples[_triple_ranks(cands, triple_idx)] == 0
+        ).sum(axis=1)
+
+    # Penalize heavy overlap with existing tickets
+    overlaps = existing[:, cands].sum(axis=2)
+    overlap_penalty = (np.maximum(overlaps - 4, 0) * 3).sum(axis=0)
+
+    # Balance: prefer 2-5 odd numbers; sum range: avoid extreme sums
+    odd_lo, odd_hi = odd_range
+    odd_count = (cands & 1).sum(axis=1)
+    sum_deviation = np.abs(cands.sum(axis=1) - expected_sum)
+    penalties = (np.where((odd_count < odd_lo) | (odd_count > odd_hi), 5.0, 0.0)
+                 + np.where(sum_deviation > sum_tolerance, 3.0, 0.0))
+
+    return new_pairs + 0.3 * new_triples - overlap_penalty - penalties
+
+
+def _sample_tickets(rng, n_samples, n_numbers, min_num, max_num):
+    """Draw n_samples sorted tickets in one batch, shape (n_samples, n_numbers)"""
+    keys = rng.random((n_samples, max_num - min_num + 1))
+    cands = np.argpartition(keys, n_numbers - 1, axis=1)[:, :n_numbers] + min_num
+    cands.sort(axis=1)
+    return cands
+
+
+def _calculate_coverage_stats(portfolio, n_pairs_covered, n_triples_covered,
                                total_possible_pairs, max_num):
-    """Calculate detailed coverage statistics"""
-    all_numbers_used = set()
-    for ticket in portfolio:
-        all_numbers_used.update(ticket)
-
-    overlaps = []
-    for i in range(len(portfolio)):
-        for j in range(i + 1, len(portfolio)):
-            overlap = len(set(portfolio[i]) & set(portfolio[j]))
-            overlaps.append(overlap)
-
-    number_freq = Counter()
-    for ticket in portfolio:
-        for n in ticket:
-            number_freq[n] += 1
-
-    freq_values = list(number_freq.values()) if number_freq else [0]
-
-    most_common = number_freq.most_common(1)
-    least_common = number_freq.most_common()[-1:] if number_freq else []
+    """Calculate detailed coverage statistics (portfolio: array or list of tickets)"""
+    n_tickets = len(portfolio)
+    tickets = (np.asarray(portfolio, dtype=np.intp).reshape(n_tickets, -1)
+               if n_tickets else np.empty((0, 0), dtype=np.intp))
+    membership = np.zeros((n_tickets, max_num + 1), dtype=np.int32)
+    membership[np.arange(n_tickets)[:, None], tickets] = 1
+
+    # Pairwise overlaps are the off-diagonal entries of M @ M.T
+    overlaps = (membership @ membership.T)[np.triu_indices(n_tickets, k=1)]
+
+    # Used numbers in order of first appearance (Counter's tie-break order)
+    flat = tickets.ravel()
+    number_freq = np.bincount(flat, minlength=max_num + 1)
+    used, first_seen = np.unique(flat, return_index=True)
+    used = used[np.argsort(first_seen, kind='stable')]
+    freq_values = number_freq[used]
+
+    if len(used):
+        top = int(np.argmax(freq_values))
+        bottom = len(used) - 1 - int(np.argmin(freq_values[::-1]))
+        most_used = (int(used[top]), int(freq_values[top]))
+        least_used = (int(used[bottom]), int(freq_values[bottom]))
+    else:
+        most_used = least_used = (0, 0)
 
     return {
         'total_tickets': len(portfolio),
-        'unique_numbers': len(all_numbers_used),
-        'number_coverage_pct': len(all_numbers_used) / max_num * 100,
-        'pairs_covered': len(covered_pairs),
+        'unique_numbers': len(used),
+        'number_coverage_pct': len(used) / max_num * 100,
+        'pairs_covered': n_pairs_covered,
         'pairs_total': total_possible_pairs,
-        'pair_coverage_pct': (len(covered_pairs) / total_possible_pairs * 100
+        'pair_coverage_pct': (n_pairs_covered / total_possible_pairs * 100
                               if total_possible_pairs > 0 else 0),
-        'triples_covered': len(covered_triples),
-        'avg_overlap': float(np.mean(overlaps)) if overlaps else 0.0,
-        'max_overlap': max(overlaps) if overlaps else 0,
-        'min_overlap': min(overlaps) if overlaps else 0,
-        'number_freq_std': float(np.std(freq_values)),
-        'most_used_number': most_common[0] if most_common else (0, 0),
-        'least_used_number': least_common[0] if least_common else (0, 0),
+        'triples_covered': n_triples_covered,
+        'avg_overlap': float(np.mean(overlaps)) if overlaps.size else 0.0,
+        'max_overlap': int(overlaps.max()) if overlaps.size else 0,
+        'min_overlap': int(overlaps.min()) if overlaps.size else 0,
+        'number_freq_std': float(np.std(freq_values)) if len(used) else 0.0,
+        'most_used_number': most_used,
+        'least_used_number': least_used,
     }
 
 
 def generate_random_portfolio(n_tickets, n_numbers=NUMBERS_PER_DRAW,
-                               min_num=MIN_NUMBER, max_num=MAX_NUMBER):
+                               min_num=MIN_NUMBER, max_num=MAX_NUMBER,
+                               seed=None):
     """Generate purely random portfolio for baseline comparison"""
-    all_numbers = list(range(min_num, max_num + 1))
-    portfolio = []
-
-    for _ in range(n_tickets):
-        ticket = sorted(random.sample(all_numbers, n_numbers))
-        portfolio.append(ticket)
-
-    covered_pairs = set()
-    covered_triples = set()
-    for ticket in portfolio:
-        for i in range(len(ticket)):
-            for j in range(i + 1, len(ticket)):
-                covered_pairs.add((ticket[i], ticket[j]))
-                for k in range(j + 1, len(ticket)):
-                    covered_triples.add((ticket[i], ticket[j], ticket[k]))
-
-    total_possible_pairs = 0
-    for i in range(min_num, max_num + 1):
-        for j in range(i + 1, max_num + 1):
-            total_possible_pairs += 1
+    rng = get_rng(seed)
+    tickets = _sample_tickets(rng, n_tickets, n_numbers, min_num, max_num)
+
+    pair_idx, triple_idx = _ticket_combo_index(n_numbers)
+    size = max_num + 1
+    covered_pairs = np.zeros((size, size), dtype=np.uint8)
+    covered_triples = np.zeros(comb(size, 3), dtype=np.uint8)
+
+    covered_pairs[tickets[:, pair_idx[0]], tickets[:, pair_idx[1]]] = 1
+    covered_triples[_triple_ranks(tickets, triple_idx)] = 1
+
+    total_possible_pairs = comb(max_num - min_num + 1, 2)
 
     coverage_stats = _calculate_coverage_stats(
-        portfolio, covered_pairs, covered_triples,
+        tickets, int(covered_pairs.sum()), int(covered_triples.sum()),
         total_possible_pairs, max_num
     )
 
-    return portfolio, coverage_stats
\ No newline at end of file
+    return tickets.tolist(), coverage_stats
\ No newline at end of file
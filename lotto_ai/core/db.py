@@ -1,14 +1,28 @@
 """
 Database layer for Loto Serbia - Enhanced with coverage tracking
 """
-from sqlalchemy import create_engine, Column, Integer, String, Float, Boolean, Text, ForeignKey
+import json
+from sqlalchemy import create_engine, event, Index, Column, Integer, String, Float, Boolean, Text, ForeignKey, JSON
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
-from lotto_ai.config import DB_PATH, logger
+from sqlalchemy.types import TypeDecorator
+from lotto_ai.config import DB_PATH, ensure_data_dir, logger
 
 Base = declarative_base()
 
 
+class _LenientJSON(TypeDecorator):
+    """JSON text column that stringifies non-JSON values (dates, numpy scalars)"""
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else json.dumps(value, default=str)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else json.loads(value)
+
+
 class Draw(Base):
     __tablename__ = 'draws'
 
@@ -28,6 +42,10 @@ class Draw(Base):
 
 class Prediction(Base):
     __tablename__ = 'predictions'
+    __table_args__ = (
+        Index('ix_pred_pending', 'evaluated', 'target_draw_date'),
+        Index('ix_pred_strategy', 'strategy_name', 'evaluated'),
+    )
 
     prediction_id = Column(Integer, primary_key=True, autoincrement=True)
     created_at = Column(String, nullable=False)
@@ -35,8 +53,8 @@ class Prediction(Base):
     strategy_name = Column(String, nullable=False)
     model_version = Column(String)
     portfolio_size = Column(Integer)
-    tickets = Column(Text, nullable=False)
-    model_metadata = Column(Text)
+    tickets = Column(JSON, nullable=False)
+    model_metadata = Column(_LenientJSON)
     evaluated = Column(Boolean, default=False)
 
     results = relationship("PredictionResult", back_populates="prediction")
@@ -44,15 +62,18 @@ class Prediction(Base):
 
 class PredictionResult(Base):
     __tablename__ = 'prediction_results'
+    __table_args__ = (
+        Index('ix_result_evaluated_at', 'evaluated_at'),
+    )
 
     result_id = Column(Integer, primary_key=True, autoincrement=True)
     prediction_id = Column(Integer, ForeignKey('predictions.prediction_id'))
-    actual_numbers = Column(Text, nullable=False)
+    actual_numbers = Column(JSON, nullable=False)
     evaluated_at = Column(String, nullable=False)
     best_match = Column(Integer)
     total_matches = Column(Integer)
     prize_value = Column(Float)
-    ticket_matches = Column(Text)
+    ticket_matches = Column(JSON)
 
     prediction = relationship("Prediction", back_populates="results")
 
@@ -62,13 +83,16 @@ class PlayedTicket(Base):
 
     play_id = Column(Integer, primary_key=True, autoincrement=True)
     prediction_id = Column(Integer, ForeignKey('predictions.prediction_id'))
-    ticket_numbers = Column(Text, nullable=False)
+    ticket_numbers = Column(JSON, nullable=False)
     played_at = Column(String, nullable=False)
     draw_date = Column(String, nullable=False)
 
 
 class AdaptiveWeight(Base):
     __tablename__ = 'adaptive_weights'
+    __table_args__ = (
+        Index('ix_weights_lookup', 'strategy_name', 'weight_type', 'updated_at'),
+    )
 
     weight_id = Column(Integer, primary_key=True, autoincrement=True)
     updated_at = Column(String, nullable=False)
@@ -109,14 +133,31 @@ class CoverageAnalysis(Base):
 
 
 # Database engine
+ensure_data_dir()
+# JSON columns are stored as JSON text, so existing TEXT rows read back as-is
 engine = create_engine(f'sqlite:///{DB_PATH}', echo=False)
 SessionLocal = sessionmaker(bind=engine)
 
 
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """WAL lets readers (GUI) run alongside writers; NORMAL sync is safe under WAL"""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+    finally:
+        cursor.close()
+
+
 def init_db():
     """Initialize database tables"""
     try:
         Base.metadata.create_all(engine)
+        # create_all skips existing tables, so add indexes declared later on
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=engine, checkfirst=True)
         logger.info("Database initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
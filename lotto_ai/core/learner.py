@@ -3,15 +3,76 @@ Adaptive learning - v3.0
 Tracks portfolio STRATEGY performance, not lottery patterns.
 """
 from datetime import datetime
+import copy
+import functools
 import json
+import time
 from lotto_ai.core.db import get_session, AdaptiveWeight
 from lotto_ai.core.tracker import PredictionTracker
 from lotto_ai.config import logger
 
 
+# Weights change at most a few times a day; reuse lookups within this window
+WEIGHTS_CACHE_SECONDS = 60
+
+# (weight_type, default value) for every weight a strategy carries
+DEFAULT_WEIGHTS = (('coverage_ratio', 1.0), ('random_ratio', 0.0))
+
+# vs_random above the first / below the second shifts weight toward / away from coverage
+DEFAULT_THRESHOLDS = (1.05, 0.90)
+
+
+def _load_weights(strategy_name):
+    """Latest weight per type for a strategy, straight from the DB"""
+    session = get_session()
+    try:
+        weight_types = [wtype for wtype, _ in DEFAULT_WEIGHTS]
+        rows = session.query(AdaptiveWeight).filter(
+            AdaptiveWeight.strategy_name == strategy_name,
+            AdaptiveWeight.weight_type.in_(weight_types)
+        ).order_by(
+            AdaptiveWeight.weight_type, AdaptiveWeight.updated_at.desc()
+        ).all()
+
+        # Rows are newest-first within each type; keep the first per type
+        latest = {}
+        for row in rows:
+            latest.setdefault(row.weight_type, row)
+
+        weights = {}
+        for weight_type, default in DEFAULT_WEIGHTS:
+            weight = latest.get(weight_type)
+            if weight:
+                weights[weight_type] = {
+                    'value': weight.weight_value,
+                    'performance': weight.performance_score,
+                    'n_obs': weight.n_observations
+                }
+            else:
+                weights[weight_type] = {
+                    'value': default, 'performance': 0.0, 'n_obs': 0
+                }
+
+        # Backward compatibility aliases
+        weights['frequency_ratio'] = weights.get('coverage_ratio',
+                                                  {'value': 1.0})
+        weights['random_ratio'] = weights.get('random_ratio',
+                                               {'value': 0.0})
+        return weights
+    finally:
+        session.close()
+
+
+@functools.lru_cache(maxsize=8)
+def _cached_weights(strategy_name, bucket):
+    """_load_weights memoized per time bucket"""
+    return _load_weights(strategy_name)
+
+
 class AdaptiveLearner:
 
-    def __init__(self):
+    def __init__(self, thresholds=DEFAULT_THRESHOLDS):
+        self.thresholds = thresholds
         self.tracker = PredictionTracker()
         self._initialize_weights()
 
@@ -20,57 +81,33 @@ class AdaptiveLearner:
         try:
             count = session.query(AdaptiveWeight).count()
             if count == 0:
-                defaults = [
-                    ('coverage_optimized', 'coverage_ratio', 1.0, 0.0, 0),
-                    ('coverage_optimized', 'random_ratio', 0.0, 0.0, 0),
-                ]
-                for strategy, wtype, value, score, n_obs in defaults:
-                    weight = AdaptiveWeight(
-                        updated_at=datetime.now().isoformat(),
-                        strategy_name=strategy,
+                now = datetime.now().isoformat()
+                session.bulk_save_objects([
+                    AdaptiveWeight(
+                        updated_at=now,
+                        strategy_name='coverage_optimized',
                         weight_type=wtype,
                         weight_value=value,
-                        performance_score=score,
-                        n_observations=n_obs
+                        performance_score=0.0,
+                        n_observations=0
                     )
-                    session.add(weight)
+                    for wtype, value in DEFAULT_WEIGHTS
+                ])
                 session.commit()
+                _cached_weights.cache_clear()
         except Exception as e:
             session.rollback()
             logger.error(f"Error initializing weights: {e}")
         finally:
             session.close()
 
-    def get_current_weights(self, strategy_name='coverage_optimized'):
-        session = get_session()
-        try:
-            weights = {}
-            for weight_type in ['coverage_ratio', 'random_ratio']:
-                weight = session.query(AdaptiveWeight).filter_by(
-                    strategy_name=strategy_name,
-                    weight_type=weight_type
-                ).order_by(AdaptiveWeight.updated_at.desc()).first()
-
-                if weight:
-                    weights[weight_type] = {
-                        'value': weight.weight_value,
-                        'performance': weight.performance_score,
-                        'n_obs': weight.n_observations
-                    }
-                else:
-                    default = 1.0 if weight_type == 'coverage_ratio' else 0.0
-                    weights[weight_type] = {
-                        'value': default, 'performance': 0.0, 'n_obs': 0
-                    }
-
-            # Backward compatibility aliases
-            weights['frequency_ratio'] = weights.get('coverage_ratio',
-                                                      {'value': 1.0})
-            weights['random_ratio'] = weights.get('random_ratio',
-                                                   {'value': 0.0})
-            return weights
-        finally:
-            session.close()
+    def get_current_weights(self, strategy_name='coverage_optimized',
+                            use_cache=True):
+        """Latest weights; cached for up to a minute unless use_cache=False"""
+        if not use_cache:
+            return _load_weights(strategy_name)
+        bucket = int(time.time() // WEIGHTS_CACHE_SECONDS)
+        return copy.deepcopy(_cached_weights(strategy_name, bucket))
 
     def update_weights(self, strategy_name='coverage_optimized', window=20):
         perf = self.tracker.get_strategy_performance(strategy_name, window)
@@ -83,9 +120,10 @@ class AdaptiveLearner:
         vs_random = perf.get('vs_random', 1.0)
         current_coverage = current.get('coverage_ratio', {}).get('value', 1.0)
 
-        if vs_random >= 1.05:
+        upper, lower = self.thresholds
+        if vs_random >= upper:
             new_coverage = min(1.0, current_coverage + 0.05)
-        elif vs_random < 0.90:
+        elif vs_random < lower:
             new_coverage = max(0.50, current_coverage - 0.05)
         else:
             new_coverage = current_coverage
@@ -94,18 +132,21 @@ class AdaptiveLearner:
 
         session = get_session()
         try:
-            for wtype, value in [('coverage_ratio', new_coverage),
-                                  ('random_ratio', new_random)]:
-                weight = AdaptiveWeight(
-                    updated_at=datetime.now().isoformat(),
+            now = datetime.now().isoformat()
+            session.bulk_save_objects([
+                AdaptiveWeight(
+                    updated_at=now,
                     strategy_name=strategy_name,
                     weight_type=wtype,
                     weight_value=value,
                     performance_score=perf['hit_rate_3plus'],
                     n_observations=perf['n_predictions']
                 )
-                session.add(weight)
+                for wtype, value in [('coverage_ratio', new_coverage),
+                                     ('random_ratio', new_random)]
+            ])
             session.commit()
+            _cached_weights.cache_clear()
 
             logger.info(f"Weights updated: {new_coverage:.0%} coverage / "
                         f"{new_random:.0%} random")
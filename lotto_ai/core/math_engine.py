@@ -2,22 +2,22 @@
 Core mathematical engine for lottery analysis.
 All computations are exact and rigorous.
 """
+import copy
+import functools
 import numpy as np
 from math import comb
 from scipy import stats as scipy_stats
-from collections import Counter
-import itertools
+from scipy.special import ndtr, stdtr
 from lotto_ai.config import (
     MIN_NUMBER, MAX_NUMBER, NUMBERS_PER_DRAW,
     TOTAL_COMBINATIONS, PRIZE_TABLE, TICKET_COST, logger
 )
+from lotto_ai.core.bitmask import presence_matrix
 
 
-def match_probability(k, n_pool=MAX_NUMBER, n_draw=NUMBERS_PER_DRAW):
-    """
-    Exact probability of matching exactly k numbers.
-    Hypergeometric distribution.
-    """
+@functools.lru_cache(maxsize=1024)
+def _hypergeom_pmf(k, n_pool, n_draw):
+    """Hypergeometric P(exactly k of n_draw picked numbers are drawn)"""
     if k < 0 or k > n_draw:
         return 0.0
     remaining = n_pool - n_draw
@@ -29,25 +29,54 @@ def match_probability(k, n_pool=MAX_NUMBER, n_draw=NUMBERS_PER_DRAW):
     return numerator / denominator
 
 
+# Match-count PMF and tail sums for the game's own pool, built once
+_PMF = np.array([_hypergeom_pmf(k, MAX_NUMBER, NUMBERS_PER_DRAW)
+                 for k in range(NUMBERS_PER_DRAW + 1)])
+_SF = np.array([sum(_PMF[k:].tolist()) for k in range(NUMBERS_PER_DRAW + 1)])
+
+
+def match_probability(k, n_pool=MAX_NUMBER, n_draw=NUMBERS_PER_DRAW):
+    """
+    Exact probability of matching exactly k numbers.
+    Hypergeometric distribution.
+    """
+    if n_pool == MAX_NUMBER and n_draw == NUMBERS_PER_DRAW:
+        return float(_PMF[k]) if 0 <= k <= n_draw else 0.0
+    return _hypergeom_pmf(k, n_pool, n_draw)
+
+
 def match_probability_at_least(k, n_pool=MAX_NUMBER, n_draw=NUMBERS_PER_DRAW):
     """Probability of matching at least k numbers"""
+    if n_pool == MAX_NUMBER and n_draw == NUMBERS_PER_DRAW:
+        if k > n_draw:
+            return 0.0
+        return float(_SF[max(k, 0)])
     total = 0.0
     for i in range(k, n_draw + 1):
-        total += match_probability(i, n_pool, n_draw)
+        total += _hypergeom_pmf(i, n_pool, n_draw)
     return total
 
 
+# Hashable form of the default prize table, used as a cache key
+_PRIZE_ITEMS = tuple(PRIZE_TABLE.items())
+
+
 def expected_value_per_ticket(prize_table=None, ticket_cost=None):
     """Calculate exact expected value per ticket"""
-    if prize_table is None:
-        prize_table = PRIZE_TABLE
+    prize_items = (_PRIZE_ITEMS if prize_table is None
+                   else tuple(prize_table.items()))
     if ticket_cost is None:
         ticket_cost = TICKET_COST
+    # Copy so callers can't mutate the cached result
+    return copy.deepcopy(_expected_value_cached(prize_items, ticket_cost))
+
 
+@functools.lru_cache(maxsize=32)
+def _expected_value_cached(prize_items, ticket_cost):
     ev = 0.0
     breakdown = {}
 
-    for matches, prize in prize_table.items():
+    for matches, prize in prize_items:
         p = match_probability(matches)
         contribution = p * prize
         ev += contribution
@@ -97,28 +126,55 @@ def portfolio_expected_value(n_tickets, prize_table=None, ticket_cost=None):
     }
 
 
+# Draw rows per block when accumulating pair co-occurrence counts
+_CO_OCCURRENCE_BLOCK = 65536
+
+# Drawn-number column names of the draws table
+_N_COLS = tuple(f'n{i}' for i in range(1, NUMBERS_PER_DRAW + 1))
+
+
+def _draws_matrix(draws_df):
+    """Drawn numbers as an (n_draws, NUMBERS_PER_DRAW) int array"""
+    missing = [c for c in _N_COLS if c not in draws_df.columns]
+    if missing:
+        raise ValueError(f"draws_df is missing number columns: {missing}")
+    return draws_df[list(_N_COLS)].to_numpy(dtype=np.int16)
+
+
+def _co_occurrence(draws_mat, block_size=_CO_OCCURRENCE_BLOCK):
+    """
+    MAX_NUMBER x MAX_NUMBER co-occurrence counts; the upper triangle holds
+    every i<j pair. Accumulated over row blocks so memory stays bounded for
+    long histories. Per-draw occurrence counts (not presence) keep malformed
+    draws with a repeated number weighted exactly as pair enumeration would.
+    """
+    co_occurrence = np.zeros((MAX_NUMBER, MAX_NUMBER), dtype=np.int64)
+    for start in range(0, len(draws_mat), block_size):
+        block = draws_mat[start:start + block_size]
+        occurrences = np.zeros((len(block), MAX_NUMBER), dtype=np.int32)
+        np.add.at(occurrences, (np.arange(len(block))[:, None], block - 1), 1)
+        co_occurrence += occurrences.T @ occurrences
+    return co_occurrence
+
+
 def test_lottery_fairness(draws_df):
     """
     Run rigorous statistical tests on historical draws.
     """
-    all_numbers = []
-    for _, row in draws_df.iterrows():
-        for i in range(1, NUMBERS_PER_DRAW + 1):
-            col = f'n{i}'
-            if col in draws_df.columns:
-                all_numbers.append(int(row[col]))
+    # Everything below works on the projected matrix, not the DataFrame
+    draws_mat = _draws_matrix(draws_df)
+    presence = presence_matrix(draws_mat)
 
-    n_draws = len(draws_df)
+    n_draws = len(draws_mat)
     results = {
         'n_draws': n_draws,
-        'n_total_numbers': len(all_numbers)
+        'n_total_numbers': int(draws_mat.size)
     }
 
     # TEST 1: Chi-Square for individual number uniformity
-    observed = np.zeros(MAX_NUMBER)
-    for n in all_numbers:
-        if 1 <= n <= MAX_NUMBER:
-            observed[n - 1] += 1
+    observed = np.bincount(
+        draws_mat.ravel(), minlength=MAX_NUMBER + 1
+    )[1:MAX_NUMBER + 1].astype(float)
 
     # Expected must sum to exactly the same as observed
     total_obs = float(observed.sum())
@@ -137,39 +193,28 @@ def test_lottery_fairness(draws_df):
         'expected_count': total_obs / MAX_NUMBER
     }
 
-    # TEST 2: Runs Test
+    # TEST 2: Runs Test (all numbers at once, one presence column each)
     runs_results = []
-    for num in range(MIN_NUMBER, MAX_NUMBER + 1):
-        sequence = []
-        for _, row in draws_df.iterrows():
-            drawn = [int(row[f'n{i}']) for i in range(1, NUMBERS_PER_DRAW + 1)]
-            sequence.append(1 if num in drawn else 0)
-
-        if len(sequence) >= 20:
-            n1 = sum(sequence)
-            n0 = len(sequence) - n1
-            if n1 > 0 and n0 > 0:
-                runs = 1
-                for j in range(1, len(sequence)):
-                    if sequence[j] != sequence[j - 1]:
-                        runs += 1
-
-                expected_runs = (2 * n0 * n1) / (n0 + n1) + 1
-                denom = (n0 + n1) ** 2 * (n0 + n1 - 1)
-                if denom > 0:
-                    var_runs = (2 * n0 * n1 * (2 * n0 * n1 - n0 - n1)) / denom
-                else:
-                    var_runs = 0
-
-                if var_runs > 0:
-                    z = (runs - expected_runs) / np.sqrt(var_runs)
-                    p = 2 * (1 - scipy_stats.norm.cdf(abs(z)))
-                    runs_results.append({
-                        'number': num,
-                        'z_score': float(z),
-                        'p_value': float(p),
-                        'is_random': p > 0.05
-                    })
+    if n_draws >= 20:
+        n1 = presence.sum(axis=0).astype(float)
+        n0 = n_draws - n1
+        runs = 1 + np.count_nonzero(presence[1:] != presence[:-1], axis=0)
+
+        expected_runs = (2 * n0 * n1) / n_draws + 1
+        var_runs = (2 * n0 * n1 * (2 * n0 * n1 - n0 - n1)
+                    / (n_draws ** 2 * (n_draws - 1)))
+        testable = (n1 > 0) & (n0 > 0) & (var_runs > 0)
+
+        z = (runs - expected_runs) / np.sqrt(np.where(testable, var_runs, 1.0))
+        p = 2 * (1 - ndtr(np.abs(z)))
+
+        for idx in np.flatnonzero(testable):
+            runs_results.append({
+                'number': int(idx) + 1,
+                'z_score': float(z[idx]),
+                'p_value': float(p[idx]),
+                'is_random': p[idx] > 0.05
+            })
 
     n_non_random = sum(1 for r in runs_results if not r['is_random'])
     expected_false_positives = len(runs_results) * 0.05
@@ -185,19 +230,19 @@ def test_lottery_fairness(draws_df):
     }
 
     # TEST 3: Serial Correlation
-    draw_sums = []
-    for _, row in draws_df.iterrows():
-        s = sum(int(row[f'n{i}']) for i in range(1, NUMBERS_PER_DRAW + 1))
-        draw_sums.append(s)
+    draw_sums = draws_mat.sum(axis=1, dtype=np.int64).astype(np.float64)
 
     if len(draw_sums) >= 10:
-        corr_matrix = np.corrcoef(draw_sums[:-1], draw_sums[1:])
-        correlation = float(corr_matrix[0, 1]) if not np.isnan(corr_matrix[0, 1]) else 0.0
+        # Lag-1 Pearson correlation without stacking a 2xN matrix
+        prev = draw_sums[:-1] - draw_sums[:-1].mean()
+        curr = draw_sums[1:] - draw_sums[1:].mean()
+        denom = np.sqrt((prev @ prev) * (curr @ curr))
+        correlation = float(np.clip(prev @ curr / denom, -1, 1)) if denom > 0 else 0.0
 
         n_corr = len(draw_sums) - 1
         if abs(correlation) < 1 and n_corr > 2:
             t_stat = correlation * np.sqrt(n_corr - 2) / np.sqrt(1 - correlation ** 2)
-            p_value = float(2 * (1 - scipy_stats.t.cdf(abs(t_stat), n_corr - 2)))
+            p_value = float(2 * (1 - stdtr(n_corr - 2, abs(t_stat))))
         else:
             t_stat = 0.0
             p_value = 1.0
@@ -219,21 +264,11 @@ def test_lottery_fairness(draws_df):
         }
 
     # TEST 4: Pair Frequency
-    pair_counts = Counter()
-    for _, row in draws_df.iterrows():
-        drawn = sorted([int(row[f'n{i}']) for i in range(1, NUMBERS_PER_DRAW + 1)])
-        for pair in itertools.combinations(drawn, 2):
-            pair_counts[pair] += 1
-
     n_possible_pairs = comb(MAX_NUMBER, 2)
 
     if n_possible_pairs > 0 and n_draws >= 50:
-        pair_observed = []
-        for i in range(MIN_NUMBER, MAX_NUMBER + 1):
-            for j in range(i + 1, MAX_NUMBER + 1):
-                pair_observed.append(pair_counts.get((i, j), 0))
-
-        pair_observed = np.array(pair_observed, dtype=float)
+        co_occurrence = _co_occurrence(draws_mat)
+        pair_observed = co_occurrence[np.triu_indices(MAX_NUMBER, k=1)].astype(float)
         total_pair_obs = float(pair_observed.sum())
 
         # CRITICAL: expected must sum to exactly the same as observed
@@ -287,29 +322,26 @@ def number_statistics(draws_df):
     if n_draws == 0:
         return {}
 
+    presence = presence_matrix(_draws_matrix(draws_df))
+    appearances = presence.sum(axis=0)
+    # Index of the last draw containing each number (-1 if never seen)
+    last_seen = np.where(
+        presence.any(axis=0), n_draws - 1 - presence[::-1].argmax(axis=0), -1
+    )
+    current_gaps = np.where(last_seen >= 0, n_draws - 1 - last_seen, n_draws)
+
     stats = {}
     expected_freq = NUMBERS_PER_DRAW / MAX_NUMBER
 
     for num in range(MIN_NUMBER, MAX_NUMBER + 1):
-        appearances = 0
-        last_seen = None
-
-        for idx in range(n_draws):
-            row = draws_df.iloc[idx]
-            drawn = [int(row[f'n{i}']) for i in range(1, NUMBERS_PER_DRAW + 1)]
-            if num in drawn:
-                appearances += 1
-                last_seen = idx
-
-        current_gap = (n_draws - 1 - last_seen) if last_seen is not None else n_draws
-        freq = appearances / n_draws
+        freq = int(appearances[num - 1]) / n_draws
 
         stats[num] = {
-            'appearances': appearances,
+            'appearances': int(appearances[num - 1]),
             'frequency': freq,
             'expected_frequency': expected_freq,
             'deviation_from_expected': freq - expected_freq,
-            'current_gap': current_gap,
+            'current_gap': int(current_gaps[num - 1]),
         }
 
     return stats
@@ -2,7 +2,7 @@
 Production model for Loto Serbia - v3.0
 """
 import numpy as np
-import random
+from math import comb
 from lotto_ai.config import (
     MIN_NUMBER, MAX_NUMBER, NUMBERS_PER_DRAW, NUMBER_RANGE, logger
 )
@@ -10,10 +10,20 @@ from lotto_ai.core.coverage_optimizer import (
     optimize_portfolio_coverage,
     generate_random_portfolio
 )
+from lotto_ai.core.bitmask import NUMBER_BITS, get_rng, masks_from_tickets, popcount
+
+__all__ = [
+    'generate_adaptive_portfolio',
+    'portfolio_statistics',
+    'generate_ticket_safe',
+    'sample_weighted_tickets',
+    'frequency_probability'
+]
 
 
 def generate_adaptive_portfolio(features, n_tickets=10, use_adaptive=True,
-                                 strategy='coverage_optimized'):
+                                 strategy='coverage_optimized', with_stats=True,
+                                 seed=None):
     """
     Generate a portfolio of lottery tickets.
 
@@ -21,9 +31,14 @@ def generate_adaptive_portfolio(features, n_tickets=10, use_adaptive=True,
       - 'coverage_optimized': Maximize pair/triple coverage (DEFAULT)
       - 'pure_random': Completely random (baseline)
       - 'hybrid': Mix of coverage-optimized and random
+
+    With with_stats, metadata['portfolio_stats'] holds portfolio_statistics()
+    of the returned portfolio, so callers need not recompute it.
+    All branches draw from one generator (seed: int or Generator).
     """
+    rng = get_rng(seed)
     if strategy == 'pure_random' or not use_adaptive:
-        portfolio, stats = generate_random_portfolio(n_tickets)
+        portfolio, stats = generate_random_portfolio(n_tickets, seed=rng)
         metadata = {
             'strategy': 'pure_random',
             'n_tickets': n_tickets,
@@ -33,10 +48,9 @@ def generate_adaptive_portfolio(features, n_tickets=10, use_adaptive=True,
             'frequency_ratio': 0.0,
             'random_ratio': 1.0
         }
-        return portfolio, metadata
 
     elif strategy == 'coverage_optimized':
-        portfolio, stats = optimize_portfolio_coverage(n_tickets)
+        portfolio, stats = optimize_portfolio_coverage(n_tickets, seed=rng)
         metadata = {
             'strategy': 'coverage_optimized',
             'n_tickets': n_tickets,
@@ -47,14 +61,13 @@ def generate_adaptive_portfolio(features, n_tickets=10, use_adaptive=True,
             'random_ratio': 0.0,
             'pair_coverage_pct': stats['pair_coverage_pct'],
         }
-        return portfolio, metadata
 
     else:  # hybrid
         n_optimized = max(1, int(n_tickets * 0.7))
         n_random = n_tickets - n_optimized
 
-        optimized, opt_stats = optimize_portfolio_coverage(n_optimized)
-        random_tickets, rnd_stats = generate_random_portfolio(n_random)
+        optimized, opt_stats = optimize_portfolio_coverage(n_optimized, seed=rng)
+        random_tickets, rnd_stats = generate_random_portfolio(n_random, seed=rng)
 
         portfolio = optimized + random_tickets
 
@@ -66,21 +79,22 @@ def generate_adaptive_portfolio(features, n_tickets=10, use_adaptive=True,
             'frequency_ratio': n_optimized / n_tickets,
             'random_ratio': n_random / n_tickets,
         }
-        return portfolio, metadata
+
+    if with_stats:
+        metadata['portfolio_stats'] = portfolio_statistics(portfolio)
+    return portfolio, metadata
 
 
 def _serialize_stats(stats):
     """Make stats JSON-serializable"""
     serializable = {}
     for k, v in stats.items():
-        if isinstance(v, (np.integer, np.int64)):
-            serializable[k] = int(v)
-        elif isinstance(v, (np.floating, np.float64)):
-            serializable[k] = float(v)
+        if isinstance(v, np.ndarray):
+            serializable[k] = v.tolist()
+        elif isinstance(v, np.generic):
+            serializable[k] = v.item()
         elif isinstance(v, tuple):
             serializable[k] = list(v)
-        elif isinstance(v, np.ndarray):
-            serializable[k] = v.tolist()
         else:
             serializable[k] = v
     return serializable
@@ -88,67 +102,59 @@ def _serialize_stats(stats):
 
 def portfolio_statistics(portfolio):
     """Calculate portfolio quality metrics"""
-    import itertools
-    from collections import Counter
-
-    all_numbers = set()
-    for ticket in portfolio:
-        all_numbers.update(ticket)
-
-    overlaps = []
-    for i in range(len(portfolio)):
-        for j in range(i + 1, len(portfolio)):
-            overlap = len(set(portfolio[i]) & set(portfolio[j]))
-            overlaps.append(overlap)
+    masks = masks_from_tickets(portfolio)
+    all_numbers = int(np.bitwise_or.reduce(masks)) if len(masks) else 0
 
-    covered_pairs = set()
-    for ticket in portfolio:
-        for i in range(len(ticket)):
-            for j in range(i + 1, len(ticket)):
-                covered_pairs.add((ticket[i], ticket[j]))
+    i, j = np.triu_indices(len(masks), k=1)
+    overlaps = popcount(masks[i] & masks[j])
 
-    total_pairs = 0
-    for i in range(MIN_NUMBER, MAX_NUMBER + 1):
-        for j in range(i + 1, MAX_NUMBER + 1):
-            total_pairs += 1
+    # Ticket x number membership; (T.T @ T)[a, b] > 0 iff some ticket has a and b
+    membership = ((masks[:, None] & NUMBER_BITS) != 0).astype(np.int32)
+    pair_counts = membership.T @ membership
+    covered_pairs = int(np.count_nonzero(np.triu(pair_counts, k=1)))
 
-    number_freq = Counter()
-    for ticket in portfolio:
-        for n in ticket:
-            number_freq[n] += 1
-
-    freq_vals = list(number_freq.values()) if number_freq else [0]
+    total_pairs = comb(MAX_NUMBER - MIN_NUMBER + 1, 2)
 
     return {
         'total_tickets': len(portfolio),
-        'unique_numbers': len(all_numbers),
-        'coverage_pct': len(all_numbers) / MAX_NUMBER * 100,
-        'pair_coverage': len(covered_pairs),
-        'pair_coverage_pct': (len(covered_pairs) / total_pairs * 100
+        'unique_numbers': all_numbers.bit_count(),
+        'coverage_pct': all_numbers.bit_count() / MAX_NUMBER * 100,
+        'pair_coverage': covered_pairs,
+        'pair_coverage_pct': (covered_pairs / total_pairs * 100
                               if total_pairs > 0 else 0),
-        'avg_overlap': float(np.mean(overlaps)) if overlaps else 0,
-        'max_overlap': max(overlaps) if overlaps else 0,
-        'min_overlap': min(overlaps) if overlaps else 0,
+        'avg_overlap': float(np.mean(overlaps)) if overlaps.size else 0,
+        'max_overlap': int(overlaps.max()) if overlaps.size else 0,
+        'min_overlap': int(overlaps.min()) if overlaps.size else 0,
     }
 
 
-def generate_ticket_safe(probs, n_numbers=NUMBERS_PER_DRAW, max_attempts=100):
+def generate_ticket_safe(probs, n_numbers=NUMBERS_PER_DRAW, max_attempts=100,
+                         rng=None):
     """Generate a single ticket from probability distribution (backward compat)"""
+    rng = get_rng(rng)
     numbers = probs.index.values
     probs_array = probs.values.astype(float)
     probs_array = np.clip(probs_array, 1e-10, None)
-    probs_array = probs_array / probs_array.sum()
-
-    for _ in range(max_attempts):
-        try:
-            ticket = np.random.choice(
-                numbers, size=n_numbers, replace=False, p=probs_array
-            )
-            return sorted(ticket.tolist())
-        except Exception:
-            continue
-
-    return sorted(random.sample(range(MIN_NUMBER, MAX_NUMBER + 1), n_numbers))
+
+    if len(numbers) < n_numbers or not np.all(np.isfinite(probs_array)):
+        return sorted(rng.choice(np.arange(MIN_NUMBER, MAX_NUMBER + 1),
+                                 n_numbers, replace=False).tolist())
+
+    return sample_weighted_tickets(numbers, probs_array, 1, n_numbers, rng)[0]
+
+
+def sample_weighted_tickets(numbers, weights, n_tickets,
+                            n_numbers=NUMBERS_PER_DRAW, rng=None):
+    """
+    Weighted sampling without replacement for a batch of tickets
+    (Gumbel top-k: the k largest log(w) + Gumbel noise).
+    """
+    rng = get_rng(rng)
+    numbers = np.asarray(numbers)
+    logp = np.log(np.asarray(weights, dtype=float))
+    gumbel = -np.log(-np.log(rng.random((n_tickets, len(numbers)))))
+    idx = np.argpartition(logp + gumbel, -n_numbers, axis=1)[:, -n_numbers:]
+    return np.sort(numbers[idx], axis=1).tolist()
 
 
 def frequency_probability(features, smoothing=1.0):
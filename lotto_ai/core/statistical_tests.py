@@ -2,20 +2,48 @@
 Rigorous statistical fairness tests for lottery draws.
 Tests whether the lottery shows any exploitable deviation from uniformity.
 """
+import functools
 import numpy as np
 import pandas as pd
 from math import comb
 from datetime import datetime
 from scipy import stats as scipy_stats
-from collections import Counter
+from scipy.special import ndtr
 import json
-import itertools
+from sqlalchemy import select
 
 from lotto_ai.config import (
     logger, NUMBER_RANGE, NUMBERS_PER_DRAW, MAX_NUMBER, MIN_NUMBER,
     TOTAL_COMBINATIONS, MATCH_PROBABILITIES
 )
 from lotto_ai.core.db import get_session, FairnessTest, Draw
+from lotto_ai.core.bitmask import presence_matrix
+
+
+# Sums beyond this many draws are subsampled for Shapiro-Wilk
+_SHAPIRO_SAMPLE = 2000
+
+
+@functools.lru_cache(maxsize=8)
+def _shapiro_sums(sums_bytes):
+    """Shapiro-Wilk (stat, p) on int64 draw sums, fixed-seed subsample if large"""
+    sums = np.frombuffer(sums_bytes, dtype=np.int64)
+    if len(sums) > _SHAPIRO_SAMPLE:
+        idx = np.random.default_rng(0).choice(len(sums), _SHAPIRO_SAMPLE,
+                                              replace=False)
+        sums = sums[idx]
+    sw_stat, sw_p = scipy_stats.shapiro(sums)
+    return float(sw_stat), float(sw_p)
+
+
+# Per-draw arrays shared by the tests, built lazily from the draws array
+_DRAW_FEATURES = {
+    'presence': presence_matrix,
+    'counts': lambda a: np.bincount(a.ravel() - 1, minlength=MAX_NUMBER),
+    'sums': lambda a: a.sum(axis=1, dtype=np.int64),
+    'odd_counts': lambda a: (a & 1).sum(axis=1),
+    'sorted': lambda a: np.sort(a, axis=1),
+}
 
 
 class LotteryFairnessAnalyzer:
@@ -27,16 +55,42 @@ class LotteryFairnessAnalyzer:
 
     def __init__(self):
         self.results = {}
+        self._p_values = np.empty(0)
+        self._draws_src = None
+        self._draws_arr = None
+        self._features = {}
 
     def load_draws(self):
         """Load all draws as list of number lists"""
         session = get_session()
         try:
-            draws = session.query(Draw).order_by(Draw.draw_date).all()
-            return [d.get_numbers() for d in draws], [d.draw_date for d in draws]
+            # Plain column rows - no ORM instances for the whole history
+            rows = session.execute(
+                select(Draw.draw_date, Draw.n1, Draw.n2, Draw.n3, Draw.n4,
+                       Draw.n5, Draw.n6, Draw.n7).order_by(Draw.draw_date)
+            ).all()
+            numbers = [list(r[1:]) for r in rows]
+            self._draws_matrix(numbers)
+            return numbers, [r[0] for r in rows]
         finally:
             session.close()
 
+    def _draws_matrix(self, draws):
+        """(n_draws, NUMBERS_PER_DRAW) int16 array of draws, cached per draws list"""
+        if draws is not self._draws_src:
+            self._draws_arr = np.asarray(draws, dtype=np.int16).reshape(
+                len(draws), NUMBERS_PER_DRAW)
+            self._draws_src = draws
+            self._features = {}
+        return self._draws_arr
+
+    def _feature(self, draws, name):
+        """Derived array from _DRAW_FEATURES, computed once per draws list"""
+        draws_arr = self._draws_matrix(draws)
+        if name not in self._features:
+            self._features[name] = _DRAW_FEATURES[name](draws_arr)
+        return self._features[name]
+
     def run_all_tests(self, save_to_db=True):
         """Run complete fairness test suite"""
         draws, dates = self.load_draws()
@@ -109,6 +163,7 @@ class LotteryFairnessAnalyzer:
             self._save_results(results)
 
         self.results = results
+        self._p_values = np.array(p_values, dtype=float)
         return results
 
     def _chi_square_uniformity(self, draws):
@@ -116,12 +171,8 @@ class LotteryFairnessAnalyzer:
         Chi-square goodness-of-fit test.
         H0: All numbers equally likely.
         """
-        all_numbers = [n for draw in draws for n in draw]
-        n_total = len(all_numbers)
-
-        observed = np.zeros(MAX_NUMBER)
-        for n in all_numbers:
-            observed[n - 1] += 1
+        observed = self._feature(draws, 'counts').astype(np.float64)
+        n_total = int(observed.sum())
 
         expected_freq = n_total / MAX_NUMBER
         expected = np.full(MAX_NUMBER, expected_freq)
@@ -147,10 +198,13 @@ class LotteryFairnessAnalyzer:
 
     def _pairs_frequency_test(self, draws):
         """Test if any pair of numbers appears together more than expected"""
-        pair_counts = Counter()
-        for draw in draws:
-            for pair in itertools.combinations(sorted(draw), 2):
-                pair_counts[pair] += 1
+        # Pair (a, b) of a sorted draw is coded a * (MAX_NUMBER + 1) + b;
+        # codes are laid out in encounter order (draw by draw, pairs in order)
+        sorted_draws = self._feature(draws, 'sorted').astype(np.int64)
+        i, j = np.triu_indices(NUMBERS_PER_DRAW, k=1)
+        base = MAX_NUMBER + 1
+        codes = (sorted_draws[:, i] * base + sorted_draws[:, j]).ravel()
+        pair_counts = np.bincount(codes, minlength=base * base)
 
         n_draws = len(draws)
         # Expected pair frequency: C(5,5)*C(37,5) ... simplified:
@@ -159,9 +213,7 @@ class LotteryFairnessAnalyzer:
             (NUMBERS_PER_DRAW - 1) / (MAX_NUMBER - 1)
         )
 
-        pair_freqs = list(pair_counts.values())
-
-        if len(pair_freqs) < 10:
+        if np.count_nonzero(pair_counts) < 10:
             return {
                 'test_name': 'Pairs Frequency',
                 'p_value': None,
@@ -170,11 +222,8 @@ class LotteryFairnessAnalyzer:
 
         # Chi-square on pair frequencies
         total_possible_pairs = comb(MAX_NUMBER, 2)
-        observed_pairs = np.zeros(total_possible_pairs)
-        all_pairs = list(itertools.combinations(range(1, MAX_NUMBER + 1), 2))
-
-        for idx, pair in enumerate(all_pairs):
-            observed_pairs[idx] = pair_counts.get(pair, 0)
+        a, b = np.triu_indices(MAX_NUMBER, k=1)
+        observed_pairs = pair_counts[(a + 1) * base + (b + 1)].astype(float)
 
         expected_arr = np.full(total_possible_pairs, expected_pair_freq)
 
@@ -185,7 +234,13 @@ class LotteryFairnessAnalyzer:
             chi2_stat = 0
             p_value = 1.0
 
-        most_common_pair = pair_counts.most_common(1)[0] if pair_counts else ((0, 0), 0)
+        # Most common pair; ties go to the pair seen first (as Counter does)
+        seen_codes, first_seen = np.unique(codes, return_index=True)
+        seen_counts = pair_counts[seen_codes]
+        tied = seen_counts == seen_counts.max()
+        top_code = int(seen_codes[tied][np.argmin(first_seen[tied])])
+        most_common_pair = ((top_code // base, top_code % base),
+                            int(pair_counts[top_code]))
 
         return {
             'test_name': 'Pairs Frequency',
@@ -203,20 +258,16 @@ class LotteryFairnessAnalyzer:
         if len(draws) < 10:
             return {'test_name': 'Serial Correlation', 'p_value': None, 'conclusion': 'INSUFFICIENT DATA'}
 
-        # For each number, create binary time series and test autocorrelation
-        correlations = []
-        for number in range(MIN_NUMBER, MAX_NUMBER + 1):
-            series = [1 if number in draw else 0 for draw in draws]
-            if len(set(series)) < 2:
-                continue
-            # Lag-1 autocorrelation
-            s = np.array(series, dtype=float)
-            mean = s.mean()
-            if np.std(s) == 0:
-                continue
-            autocorr = np.corrcoef(s[:-1], s[1:])[0, 1]
-            if not np.isnan(autocorr):
-                correlations.append(autocorr)
+        # Lag-1 autocorrelation of every number's binary time series at once
+        series = self._feature(draws, 'presence').astype(np.float64)
+        prev = series[:-1] - series[:-1].mean(axis=0)
+        curr = series[1:] - series[1:].mean(axis=0)
+        denom = np.sqrt((prev * prev).sum(axis=0) * (curr * curr).sum(axis=0))
+        # Constant series (either lag) have no defined correlation and are skipped
+        valid = denom > 0
+        correlations = np.clip(
+            (prev * curr).sum(axis=0)[valid] / denom[valid], -1, 1
+        ).tolist()
 
         if not correlations:
             return {'test_name': 'Serial Correlation', 'p_value': None, 'conclusion': 'INSUFFICIENT DATA'}
@@ -245,38 +296,25 @@ class LotteryFairnessAnalyzer:
         if len(draws) < 20:
             return {'test_name': 'Runs Test', 'p_value': None, 'conclusion': 'INSUFFICIENT DATA'}
 
-        p_values = []
-        for number in range(MIN_NUMBER, MAX_NUMBER + 1):
-            series = [1 if number in draw else 0 for draw in draws]
-            n1 = sum(series)
-            n0 = len(series) - n1
-
-            if n1 < 2 or n0 < 2:
-                continue
-
-            # Count runs
-            runs = 1
-            for i in range(1, len(series)):
-                if series[i] != series[i - 1]:
-                    runs += 1
-
-            # Expected runs and variance
-            n = n0 + n1
-            expected_runs = (2 * n0 * n1) / n + 1
-            var_runs = (2 * n0 * n1 * (2 * n0 * n1 - n)) / (n * n * (n - 1))
+        # Runs of every number's binary series, counted column-wise
+        series = self._feature(draws, 'presence')
+        n = len(series)
+        n1 = series.sum(axis=0).astype(np.float64)
+        n0 = n - n1
+        runs = 1 + (series[1:] != series[:-1]).sum(axis=0)
 
-            if var_runs <= 0:
-                continue
+        expected_runs = (2 * n0 * n1) / n + 1
+        var_runs = (2 * n0 * n1 * (2 * n0 * n1 - n)) / (n * n * (n - 1))
+        testable = (n1 >= 2) & (n0 >= 2) & (var_runs > 0)
 
-            z = (runs - expected_runs) / np.sqrt(var_runs)
-            p = 2 * (1 - scipy_stats.norm.cdf(abs(z)))
-            p_values.append(p)
+        z = (runs[testable] - expected_runs[testable]) / np.sqrt(var_runs[testable])
+        p_values = 2 * (1 - ndtr(np.abs(z)))
 
-        if not p_values:
+        if p_values.size == 0:
             return {'test_name': 'Runs Test', 'p_value': None, 'conclusion': 'INSUFFICIENT DATA'}
 
         # Fisher's method to combine p-values
-        chi2_combined = -2 * sum(np.log(max(p, 1e-15)) for p in p_values)
+        chi2_combined = -2 * float(np.log(np.clip(p_values, 1e-15, None)).sum())
         df = 2 * len(p_values)
         combined_p = 1 - scipy_stats.chi2.cdf(chi2_combined, df)
 
@@ -285,7 +323,7 @@ class LotteryFairnessAnalyzer:
             'statistic': float(chi2_combined),
             'p_value': float(combined_p),
             'n_individual_tests': len(p_values),
-            'n_individually_significant': sum(1 for p in p_values if p < 0.05),
+            'n_individually_significant': int((p_values < 0.05).sum()),
             'conclusion': 'FAIR' if combined_p > 0.05 else 'NON-RANDOM PATTERN',
             'interpretation': (
                 f"Combined runs test across all {len(p_values)} numbers. "
@@ -295,15 +333,10 @@ class LotteryFairnessAnalyzer:
 
     def _gap_distribution_test(self, draws):
         """Test if gaps between appearances follow geometric distribution"""
-        all_gaps = []
-
-        for number in range(MIN_NUMBER, MAX_NUMBER + 1):
-            last_seen = None
-            for i, draw in enumerate(draws):
-                if number in draw:
-                    if last_seen is not None:
-                        all_gaps.append(i - last_seen)
-                    last_seen = i
+        # Appearances ordered by number, then draw; gaps are diffs within a number
+        numbers, draw_idx = np.nonzero(self._feature(draws, 'presence').T)
+        same_number = numbers[1:] == numbers[:-1]
+        all_gaps = np.diff(draw_idx)[same_number]
 
         if len(all_gaps) < 30:
             return {'test_name': 'Gap Distribution', 'p_value': None, 'conclusion': 'INSUFFICIENT DATA'}
@@ -333,7 +366,7 @@ class LotteryFairnessAnalyzer:
 
     def _sum_distribution_test(self, draws):
         """Test if the sum of drawn numbers follows expected distribution"""
-        sums = [sum(draw) for draw in draws]
+        sums = self._feature(draws, 'sums')
 
         # Expected sum of 7 numbers drawn without replacement from 1..39
         # E[sum] = 7 * (1+39)/2 = 7 * 20 = 140
@@ -351,9 +384,8 @@ class LotteryFairnessAnalyzer:
 
         # Shapiro-Wilk for normality (CLT should make sums approximately normal)
         if len(sums) >= 20:
-            # Use sample if too many draws
-            test_sums = sums[:5000] if len(sums) > 5000 else sums
-            sw_stat, sw_p = scipy_stats.shapiro(test_sums)
+            # Memoized on the sums themselves, so unchanged history is not retested
+            sw_stat, sw_p = _shapiro_sums(sums.tobytes())
         else:
             sw_stat, sw_p = 0, 1.0
 
@@ -379,7 +411,7 @@ class LotteryFairnessAnalyzer:
 
     def _odd_even_test(self, draws):
         """Test if odd/even distribution matches expected"""
-        n_odd_per_draw = [sum(1 for n in draw if n % 2 == 1) for draw in draws]
+        n_odd_per_draw = self._feature(draws, 'odd_counts')
 
         # Under H0: hypergeometric distribution
         # 20 odd numbers (1,3,...,39) and 19 even numbers (2,4,...,38)
@@ -392,16 +424,16 @@ class LotteryFairnessAnalyzer:
         observed_mean = np.mean(n_odd_per_draw)
 
         # Chi-square on distribution of odd counts
-        observed_dist = Counter(n_odd_per_draw)
         categories = list(range(0, NUMBERS_PER_DRAW + 1))
 
-        observed_arr = np.array([observed_dist.get(k, 0) for k in categories], dtype=float)
+        observed_arr = np.bincount(
+            n_odd_per_draw, minlength=NUMBERS_PER_DRAW + 1
+        ).astype(float)
 
         # Expected from hypergeometric
-        expected_arr = np.array([
-            scipy_stats.hypergeom.pmf(k, MAX_NUMBER, n_odd_total, NUMBERS_PER_DRAW) * len(draws)
-            for k in categories
-        ])
+        expected_arr = scipy_stats.hypergeom.pmf(
+            np.array(categories), MAX_NUMBER, n_odd_total, NUMBERS_PER_DRAW
+        ) * len(draws)
 
         # Merge bins with expected < 5
         obs_merged = []
@@ -443,26 +475,20 @@ class LotteryFairnessAnalyzer:
 
     def _consecutive_numbers_test(self, draws):
         """Test if consecutive number pairs appear at expected rate"""
-        n_consecutive_per_draw = []
-        for draw in draws:
-            s = sorted(draw)
-            consec = sum(1 for i in range(len(s) - 1) if s[i + 1] == s[i] + 1)
-            n_consecutive_per_draw.append(consec)
-
-        # Monte Carlo estimation of expected consecutive pairs
-        rng = np.random.default_rng(42)
-        mc_consecutive = []
-        for _ in range(10000):
-            sample = sorted(rng.choice(range(MIN_NUMBER, MAX_NUMBER + 1),
-                                       size=NUMBERS_PER_DRAW, replace=False))
-            consec = sum(1 for i in range(len(sample) - 1) if sample[i + 1] == sample[i] + 1)
-            mc_consecutive.append(consec)
-
-        expected_mean = np.mean(mc_consecutive)
+        n_consecutive_per_draw = (
+            np.diff(self._feature(draws, 'sorted'), axis=1) == 1
+        ).sum(axis=1)
+
+        # Exact expectation: each of the N-1 adjacent pairs (i, i+1) is fully
+        # drawn with probability k(k-1) / (N(N-1)), so E = k(k-1) / N
+        expected_mean = NUMBERS_PER_DRAW * (NUMBERS_PER_DRAW - 1) / MAX_NUMBER
         observed_mean = np.mean(n_consecutive_per_draw)
 
-        # Two-sample t-test
-        t_stat, p_value = scipy_stats.ttest_ind(n_consecutive_per_draw, mc_consecutive)
+        # One-sample t-test against the exact mean
+        t_stat, p_value = scipy_stats.ttest_1samp(n_consecutive_per_draw, expected_mean)
+        if np.isnan(p_value):
+            # Constant sample (no spread) - nothing to test
+            t_stat, p_value = 0.0, 1.0
 
         return {
             'test_name': 'Consecutive Numbers',
@@ -484,21 +510,23 @@ class LotteryFairnessAnalyzer:
             now = datetime.now().isoformat()
             n_draws = results.get('n_draws', 0)
 
-            for key, val in results.items():
-                if isinstance(val, dict) and 'test_name' in val:
-                    ft = FairnessTest(
-                        tested_at=now,
-                        test_name=val['test_name'],
-                        statistic_value=val.get('statistic'),
-                        p_value=val.get('p_value'),
-                        conclusion=val.get('conclusion', ''),
-                        n_draws_tested=n_draws,
-                        details=json.dumps(val)
-                    )
-                    session.add(ft)
+            rows = [
+                {
+                    'tested_at': now,
+                    'test_name': val['test_name'],
+                    'statistic_value': val.get('statistic'),
+                    'p_value': val.get('p_value'),
+                    'conclusion': val.get('conclusion', ''),
+                    'n_draws_tested': n_draws,
+                    'details': json.dumps(val)
+                }
+                for val in results.values()
+                if isinstance(val, dict) and 'test_name' in val
+            ]
+            session.bulk_insert_mappings(FairnessTest, rows)
 
             session.commit()
-            logger.info(f"Saved {len([v for v in results.values() if isinstance(v, dict) and 'test_name' in v])} test results")
+            logger.info(f"Saved {len(rows)} test results")
         except Exception as e:
             session.rollback()
             logger.error(f"Error saving test results: {e}")
@@ -514,23 +542,12 @@ class LotteryFairnessAnalyzer:
         if not self.results or 'overall' not in self.results:
             self.run_all_tests()
 
-        p_values = []
-        for key, val in self.results.items():
-            if isinstance(val, dict) and 'p_value' in val:
-                if val['p_value'] is not None:
-                    p_values.append(val['p_value'])
-
-        if not p_values:
+        p_values = self._p_values
+        if p_values.size == 0:
             return 0
 
         # Score based on how many tests are borderline or significant
-        score = 0
-        for p in p_values:
-            if p < 0.01:
-                score += 100 / len(p_values)
-            elif p < 0.05:
-                score += 50 / len(p_values)
-            elif p < 0.10:
-                score += 20 / len(p_values)
-
-        return min(100, score)
\ No newline at end of file
+        weights = np.select(
+            [p_values < 0.01, p_values < 0.05, p_values < 0.10], [100, 50, 20], 0
+        )
+        return min(100, float(weights.sum()) / p_values.size)
@@ -2,11 +2,14 @@
 Prediction tracking - v3.0
 """
 from datetime import datetime
-import json
 import numpy as np
 from lotto_ai.core.db import get_session, Prediction, PredictionResult, PlayedTicket, Draw
-from lotto_ai.config import logger, PRIZE_TABLE, NUMBERS_PER_DRAW
+from lotto_ai.config import logger, NUMBERS_PER_DRAW
 from lotto_ai.core.math_engine import match_probability_at_least
+from lotto_ai.core.bitmask import PRIZE_LUT, mask_from_ticket
+
+# Chance that a single ticket matches 3+ numbers in a draw
+P_MATCH_3PLUS = match_probability_at_least(3)
 
 
 class PredictionTracker:
@@ -16,20 +19,14 @@ class PredictionTracker:
                         model_version="3.0", metadata=None):
         session = get_session()
         try:
-            # Serialize metadata safely
-            if metadata is not None:
-                meta_str = json.dumps(metadata, default=str)
-            else:
-                meta_str = json.dumps({})
-
             prediction = Prediction(
                 created_at=datetime.now().isoformat(),
                 target_draw_date=target_draw_date,
                 strategy_name=strategy_name,
                 model_version=model_version,
                 portfolio_size=len(tickets),
-                tickets=json.dumps(tickets),
-                model_metadata=meta_str,
+                tickets=tickets,
+                model_metadata=metadata if metadata is not None else {},
                 evaluated=False
             )
             session.add(prediction)
@@ -55,37 +52,21 @@ class PredictionTracker:
                 logger.error(f"Prediction {prediction_id} not found")
                 return None
 
-            tickets = json.loads(prediction.tickets)
-            ticket_matches = [
-                len(set(t) & set(actual_numbers)) for t in tickets
-            ]
-
-            best_match = max(ticket_matches)
-            total_matches = sum(ticket_matches)
-            prize_value = self._calculate_prize_value(ticket_matches)
-
-            result = PredictionResult(
-                prediction_id=prediction_id,
-                actual_numbers=json.dumps(actual_numbers),
-                evaluated_at=datetime.now().isoformat(),
-                best_match=best_match,
-                total_matches=total_matches,
-                prize_value=prize_value,
-                ticket_matches=json.dumps(ticket_matches)
-            )
-            session.add(result)
+            row = self._result_row(prediction, actual_numbers,
+                                   datetime.now().isoformat())
+            session.add(PredictionResult(**row))
 
             prediction.evaluated = True
             session.commit()
 
             logger.info(f"Evaluated prediction {prediction_id}: "
-                        f"{best_match}/7 best match")
+                        f"{row['best_match']}/7 best match")
             return {
                 'prediction_id': prediction_id,
-                'best_match': best_match,
-                'total_matches': total_matches,
-                'prize_value': prize_value,
-                'ticket_matches': ticket_matches
+                'best_match': row['best_match'],
+                'total_matches': row['total_matches'],
+                'prize_value': row['prize_value'],
+                'ticket_matches': row['ticket_matches']
             }
         except Exception as e:
             session.rollback()
@@ -97,32 +78,51 @@ class PredictionTracker:
     def auto_evaluate_pending(self):
         session = get_session()
         try:
-            pending = session.query(Prediction).filter_by(evaluated=False).all()
-
-            if not pending:
-                logger.info("Auto-evaluated 0 predictions")
-                return 0
-
-            evaluated_count = 0
-            for pred in pending:
-                draw = session.query(Draw).filter_by(
-                    draw_date=pred.target_draw_date
-                ).first()
-
-                if draw:
-                    actual_numbers = draw.get_numbers()
-                    self.evaluate_prediction(pred.prediction_id, actual_numbers)
-                    evaluated_count += 1
-
-            logger.info(f"Auto-evaluated {evaluated_count} predictions")
-            return evaluated_count
+            # Pending predictions whose draw is already known, in one join
+            pending = session.query(Prediction, Draw).join(
+                Draw, Draw.draw_date == Prediction.target_draw_date
+            ).filter(Prediction.evaluated == False).all()
+
+            evaluated_at = datetime.now().isoformat()
+            rows = []
+            for pred, draw in pending:
+                try:
+                    rows.append(self._result_row(pred, draw.get_numbers(),
+                                                 evaluated_at))
+                except Exception as e:
+                    logger.error(f"Error evaluating prediction "
+                                 f"{pred.prediction_id}: {e}")
+
+            if rows:
+                session.bulk_insert_mappings(PredictionResult, rows)
+                session.query(Prediction).filter(
+                    Prediction.prediction_id.in_(
+                        [r['prediction_id'] for r in rows])
+                ).update({'evaluated': True}, synchronize_session=False)
+                session.commit()
+
+            logger.info(f"Auto-evaluated {len(rows)} predictions")
+            return len(rows)
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error auto-evaluating predictions: {e}")
+            return 0
         finally:
             session.close()
 
     def get_strategy_performance(self, strategy_name, window=50):
         session = get_session()
         try:
-            results = session.query(PredictionResult).join(Prediction).filter(
+            # Portfolio size comes from the same join - no per-result lookup
+            results = session.query(
+                PredictionResult.best_match,
+                PredictionResult.total_matches,
+                PredictionResult.prize_value,
+                Prediction.portfolio_size
+            ).join(
+                Prediction,
+                Prediction.prediction_id == PredictionResult.prediction_id
+            ).filter(
                 Prediction.strategy_name == strategy_name,
                 Prediction.evaluated == True
             ).order_by(PredictionResult.evaluated_at.desc()).limit(window).all()
@@ -131,25 +131,15 @@ class PredictionTracker:
                 logger.info("Not enough data to track performance")
                 return None
 
-            best_matches = [r.best_match for r in results]
-            total_matches = [r.total_matches for r in results]
-            prize_values = [r.prize_value for r in results]
-
-            # Get portfolio sizes
-            n_tickets_list = []
-            for r in results:
-                pred = session.query(Prediction).filter_by(
-                    prediction_id=r.prediction_id
-                ).first()
-                if pred and pred.portfolio_size:
-                    n_tickets_list.append(pred.portfolio_size)
+            best_matches, total_matches, prize_values, sizes = zip(*results)
+            n_tickets_list = [n for n in sizes if n]
 
             hit_3plus = (sum(1 for b in best_matches if b >= 3) / len(results)
                          if results else 0)
 
             avg_tickets = float(np.mean(n_tickets_list)) if n_tickets_list else 10
             expected_3plus_rate = 1 - (
-                (1 - match_probability_at_least(3)) ** avg_tickets
+                (1 - P_MATCH_3PLUS) ** avg_tickets
             )
 
             vs_random = (hit_3plus / expected_3plus_rate
@@ -173,8 +163,25 @@ class PredictionTracker:
         finally:
             session.close()
 
+    def _result_row(self, prediction, actual_numbers, evaluated_at):
+        """PredictionResult column values for a prediction against a draw"""
+        actual_mask = mask_from_ticket(actual_numbers)
+        ticket_matches = [
+            (mask_from_ticket(t) & actual_mask).bit_count()
+            for t in prediction.tickets
+        ]
+        return {
+            'prediction_id': prediction.prediction_id,
+            'actual_numbers': actual_numbers,
+            'evaluated_at': evaluated_at,
+            'best_match': max(ticket_matches),
+            'total_matches': sum(ticket_matches),
+            'prize_value': self._calculate_prize_value(ticket_matches),
+            'ticket_matches': ticket_matches
+        }
+
     def _calculate_prize_value(self, matches_list):
-        return sum(PRIZE_TABLE.get(m, 0) for m in matches_list)
+        return int(PRIZE_LUT[np.asarray(matches_list, dtype=np.intp)].sum())
 
 
 class PlayedTicketsTracker:
@@ -182,14 +189,16 @@ class PlayedTicketsTracker:
     def save_played_tickets(self, prediction_id, tickets, draw_date):
         session = get_session()
         try:
-            for ticket in tickets:
-                played = PlayedTicket(
-                    prediction_id=prediction_id,
-                    ticket_numbers=json.dumps(ticket),
-                    played_at=datetime.now().isoformat(),
-                    draw_date=draw_date
-                )
-                session.add(played)
+            played_at = datetime.now().isoformat()
+            session.bulk_insert_mappings(PlayedTicket, [
+                {
+                    'prediction_id': prediction_id,
+                    'ticket_numbers': ticket,
+                    'played_at': played_at,
+                    'draw_date': draw_date
+                }
+                for ticket in tickets
+            ])
             session.commit()
             logger.info(f"Saved {len(tickets)} played tickets for {draw_date}")
         except Exception as e:
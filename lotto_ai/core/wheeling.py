@@ -6,11 +6,20 @@ of your keys appear in the draw, at least one ticket GUARANTEES
 a minimum number of matches.
 """
 import itertools
-import random
+import numpy as np
 from math import comb
 from lotto_ai.config import (
     MIN_NUMBER, MAX_NUMBER, NUMBERS_PER_DRAW, logger
 )
+from lotto_ai.core.bitmask import (
+    NUMBER_BITS, get_rng, mask_from_ticket, masks_from_tickets, popcount,
+    ticket_from_mask
+)
+
+# Candidate x subset cells scored per block, bounds memory for big key sets
+_SCORE_BLOCK_CELLS = 1 << 22
+# Subsets checked per block in verify_wheel_guarantee
+_VERIFY_CHUNK = 8192
 
 
 def generate_full_wheel(key_numbers, n_per_ticket=NUMBERS_PER_DRAW):
@@ -60,7 +69,7 @@ def generate_full_wheel(key_numbers, n_per_ticket=NUMBERS_PER_DRAW):
 def generate_abbreviated_wheel(key_numbers, guarantee_if_hit=3,
                                  guarantee_match=3,
                                  n_per_ticket=NUMBERS_PER_DRAW,
-                                 max_tickets=50):
+                                 max_tickets=50, seed=None):
     """
     Abbreviated wheeling: minimal tickets guaranteeing coverage.
 
@@ -73,6 +82,7 @@ def generate_abbreviated_wheel(key_numbers, guarantee_if_hit=3,
         guarantee_match: Minimum matches guaranteed on a ticket (e.g., 3)
         n_per_ticket: Numbers per ticket (7)
         max_tickets: Maximum tickets to generate
+        seed: Random seed (or Generator) for candidate sampling
 
     Returns:
         tickets, guarantee_info
@@ -100,24 +110,28 @@ def generate_abbreviated_wheel(key_numbers, guarantee_if_hit=3,
     # All possible subsets of key_numbers of size guarantee_if_hit
     hit_subsets = list(itertools.combinations(key_numbers, guarantee_if_hit))
     total_subsets = len(hit_subsets)
+    subset_masks = masks_from_tickets(hit_subsets)
 
     logger.info(f"Abbreviated wheel: {n_keys} numbers, "
                 f"guarantee-{guarantee_if_hit}, {total_subsets} subsets to cover")
 
-    uncovered = set(range(total_subsets))
+    uncovered = np.ones(total_subsets, dtype=bool)
     tickets = []
+    rng = get_rng(seed)
 
     # Numbers available to fill remaining positions
     other_numbers = [
         n for n in range(MIN_NUMBER, MAX_NUMBER + 1)
         if n not in key_numbers
     ]
+    key_bits = NUMBER_BITS[np.array(key_numbers) - 1]
+    other_bits = NUMBER_BITS[np.array(other_numbers, dtype=np.int64) - 1]
 
     iteration = 0
-    while uncovered and len(tickets) < max_tickets:
+    while uncovered.any() and len(tickets) < max_tickets:
         iteration += 1
         best_ticket = None
-        best_newly_covered = set()
+        best_newly_covered = np.zeros(total_subsets, dtype=bool)
 
         # How many key numbers to include in each candidate
         # Must include at least guarantee_match key numbers
@@ -126,52 +140,29 @@ def generate_abbreviated_wheel(key_numbers, guarantee_if_hit=3,
 
         n_candidates = min(3000, max(1000, total_subsets * 10))
 
-        for _ in range(n_candidates):
-            # Decide how many key numbers to put in this ticket
-            n_from_keys = random.randint(min_keys_in_ticket, max_keys_in_ticket)
-            n_fill = n_per_ticket - n_from_keys
-
-            chosen_keys = sorted(random.sample(key_numbers, n_from_keys))
-
-            if n_fill > 0 and other_numbers:
-                fill_count = min(n_fill, len(other_numbers))
-                chosen_fill = sorted(random.sample(other_numbers, fill_count))
-                candidate = sorted(chosen_keys + chosen_fill)
-            else:
-                candidate = chosen_keys
-
-            # Pad if needed (shouldn't happen normally)
-            while len(candidate) < n_per_ticket:
-                remaining = [
-                    n for n in range(MIN_NUMBER, MAX_NUMBER + 1)
-                    if n not in candidate
-                ]
-                if remaining:
-                    candidate.append(random.choice(remaining))
-                    candidate = sorted(candidate)
-                else:
-                    break
-
-            if len(candidate) != n_per_ticket:
-                continue
-
-            # How many uncovered subsets does this ticket cover?
-            newly_covered = set()
-            ticket_set = set(candidate)
-
-            for idx in uncovered:
-                subset = set(hit_subsets[idx])
-                matches_in_ticket = len(subset & ticket_set)
-                if matches_in_ticket >= guarantee_match:
-                    newly_covered.add(idx)
-
-            if len(newly_covered) > len(best_newly_covered):
-                best_newly_covered = newly_covered
-                best_ticket = candidate
+        # Sample all candidates at once: n_from_keys key numbers, the rest
+        # from the other numbers, padded from anything left if needed
+        n_from_keys = rng.integers(min_keys_in_ticket, max_keys_in_ticket + 1,
+                                   size=n_candidates)
+        n_fill = np.minimum(n_per_ticket - n_from_keys, len(other_bits))
+        cand_masks = np.zeros(n_candidates, dtype=np.uint64)
+        cand_masks = _add_random_bits(rng, cand_masks, key_bits, n_from_keys)
+        cand_masks = _add_random_bits(rng, cand_masks, other_bits, n_fill)
+        short = n_per_ticket - popcount(cand_masks).astype(np.int64)
+        if short.any():
+            cand_masks = _add_random_bits(rng, cand_masks, NUMBER_BITS, short)
+
+        # How many uncovered subsets does each candidate cover?
+        best_idx, newly_covered = _score_candidates(
+            cand_masks, subset_masks, uncovered, guarantee_match
+        )
+        if best_idx >= 0:
+            best_ticket = ticket_from_mask(cand_masks[best_idx])
+            best_newly_covered = newly_covered
 
-        if best_ticket is None or len(best_newly_covered) == 0:
+        if best_ticket is None or not best_newly_covered.any():
             # Fallback: force-create a ticket covering at least one subset
-            for idx in list(uncovered):
+            for idx in np.flatnonzero(uncovered):
                 subset_nums = list(hit_subsets[idx])
                 # Include all numbers from this subset
                 ticket_nums = list(subset_nums)
@@ -181,28 +172,26 @@ def generate_abbreviated_wheel(key_numbers, guarantee_if_hit=3,
                     n for n in key_numbers + other_numbers
                     if n not in ticket_nums
                 ]
-                random.shuffle(available)
+                rng.shuffle(available)
                 ticket_nums.extend(available[:remaining_needed])
                 ticket_nums = sorted(ticket_nums[:n_per_ticket])
 
                 if len(ticket_nums) == n_per_ticket:
                     best_ticket = ticket_nums
                     # Recalculate coverage
-                    best_newly_covered = set()
-                    ticket_set = set(best_ticket)
-                    for idx2 in uncovered:
-                        subset = set(hit_subsets[idx2])
-                        if len(subset & ticket_set) >= guarantee_match:
-                            best_newly_covered.add(idx2)
+                    ticket_mask = np.uint64(mask_from_ticket(best_ticket))
+                    best_newly_covered = uncovered & (
+                        popcount(subset_masks & ticket_mask) >= guarantee_match
+                    )
                     break
 
         if best_ticket is not None:
             tickets.append(best_ticket)
-            uncovered -= best_newly_covered
+            uncovered &= ~best_newly_covered
             logger.debug(
                 f"Ticket {len(tickets)}: {best_ticket} | "
-                f"Covered {len(best_newly_covered)} new subsets | "
-                f"Remaining: {len(uncovered)}"
+                f"Covered {int(best_newly_covered.sum())} new subsets | "
+                f"Remaining: {int(uncovered.sum())}"
             )
 
     # Verify
@@ -210,7 +199,8 @@ def generate_abbreviated_wheel(key_numbers, guarantee_if_hit=3,
         tickets, key_numbers, guarantee_if_hit, guarantee_match
     )
 
-    covered_count = total_subsets - len(uncovered)
+    n_uncovered = int(uncovered.sum())
+    covered_count = total_subsets - n_uncovered
     coverage_pct = covered_count / total_subsets * 100 if total_subsets > 0 else 100
 
     logger.info(f"Wheel complete: {len(tickets)} tickets, "
@@ -231,19 +221,54 @@ def generate_abbreviated_wheel(key_numbers, guarantee_if_hit=3,
         'subsets_covered': covered_count,
         'coverage_pct': coverage_pct,
         'verified': verified,
-        'uncovered_remaining': len(uncovered)
+        'uncovered_remaining': n_uncovered
     }
 
     if not verified:
         guarantee['warning'] = (
             f'Could not achieve full coverage with {max_tickets} max tickets. '
-            f'{len(uncovered)} subsets uncovered. '
+            f'{n_uncovered} subsets uncovered. '
             f'Try increasing max_tickets or reducing key numbers.'
         )
 
     return tickets, guarantee
 
 
+def _add_random_bits(rng, masks, pool_bits, counts):
+    """OR counts[i] random pool bits not already in masks[i] into each mask"""
+    keys = rng.random((len(masks), len(pool_bits)))
+    keys[(masks[:, None] & pool_bits) != 0] = np.inf
+    order = np.argsort(keys, axis=1)
+    take = np.arange(len(pool_bits)) < np.asarray(counts)[:, None]
+    picked = np.where(take, pool_bits[order], np.uint64(0))
+    # Bits are distinct, so summing them is the same as OR-ing them
+    return masks | picked.sum(axis=1, dtype=np.uint64)
+
+
+def _score_candidates(cand_masks, subset_masks, uncovered_mask, k):
+    """
+    Index of the first candidate covering the most uncovered subsets (-1 if
+    none covers any) and its bool mask of newly covered subsets.
+    Only still-uncovered subsets are scored, so rounds get cheaper as the
+    wheel fills up.
+    """
+    open_idx = np.flatnonzero(uncovered_mask)
+    open_masks = subset_masks[open_idx]
+    block = max(1, _SCORE_BLOCK_CELLS // max(1, len(open_masks)))
+    best_idx, best_count, best_hits = -1, 0, None
+    for start in range(0, len(cand_masks), block):
+        hits = popcount(cand_masks[start:start + block, None] & open_masks) >= k
+        counts = hits.sum(axis=1)
+        i = int(np.argmax(counts))
+        if counts[i] > best_count:
+            best_idx, best_count, best_hits = start + i, int(counts[i]), hits[i]
+
+    best_newly_mask = np.zeros(len(subset_masks), dtype=bool)
+    if best_hits is not None:
+        best_newly_mask[open_idx[best_hits]] = True
+    return best_idx, best_newly_mask
+
+
 def verify_wheel_guarantee(tickets, key_numbers, guarantee_if_hit,
                             guarantee_match):
     """
@@ -252,17 +277,17 @@ def verify_wheel_guarantee(tickets, key_numbers, guarantee_if_hit,
     For EVERY possible subset of `guarantee_if_hit` numbers from key_numbers,
     check that at least one ticket contains `guarantee_match` of them.
     """
-    for hit_combo in itertools.combinations(key_numbers, guarantee_if_hit):
-        hit_set = set(hit_combo)
-        covered = False
-        for ticket in tickets:
-            if len(hit_set & set(ticket)) >= guarantee_match:
-                covered = True
-                break
-        if not covered:
-            logger.debug(f"Uncovered subset: {hit_combo}")
+    ticket_masks = masks_from_tickets(tickets)
+    combos = itertools.combinations(key_numbers, guarantee_if_hit)
+    while True:
+        chunk = list(itertools.islice(combos, _VERIFY_CHUNK))
+        if not chunk:
+            return True
+        hits = popcount(masks_from_tickets(chunk)[:, None] & ticket_masks)
+        covered = (hits >= guarantee_match).any(axis=1)
+        if not covered.all():
+            logger.debug(f"Uncovered subset: {chunk[int(np.argmin(covered))]}")
             return False
-    return True
 
 
 def wheel_cost_estimate(n_key_numbers, guarantee_if_hit=3,
@@ -5,7 +5,6 @@ Smart Portfolio Manager with honest mathematics
 import streamlit as st
 import sys
 from pathlib import Path
-import json
 import numpy as np
 import pandas as pd
 
@@ -16,7 +15,7 @@ sys.path.insert(0, str(project_root))
 from lotto_ai.core.db import init_db, get_session, Draw, Prediction, PredictionResult
 from lotto_ai.core.tracker import PredictionTracker, PlayedTicketsTracker
 from lotto_ai.core.learner import AdaptiveLearner
-from lotto_ai.core.models import generate_adaptive_portfolio, portfolio_statistics
+from lotto_ai.core.models import generate_adaptive_portfolio
 from lotto_ai.core.math_engine import (
     expected_value_per_ticket, portfolio_expected_value,
     match_probability, match_probability_at_least,
@@ -27,7 +26,7 @@ from lotto_ai.core.wheeling import (
 )
 from lotto_ai.features.features import build_feature_matrix, load_draws, get_number_summary
 from lotto_ai.config import (
-    SCRAPING_ENABLED, IS_CLOUD, logger, DRAW_DAYS, DRAW_HOUR,
+    SCRAPING_ENABLED, IS_CLOUD, logger, DRAW_DAYS_SET, NEXT_DRAW_DELTA, DRAW_HOUR,
     NUMBERS_PER_DRAW, MAX_NUMBER, MIN_NUMBER, PRIZE_TABLE, TICKET_COST,
     TOTAL_COMBINATIONS
 )
@@ -42,21 +41,15 @@ def get_next_draw_info():
     current_hour = now.hour
     current_weekday = now.weekday()
 
-    if current_weekday in DRAW_DAYS:
+    if current_weekday in DRAW_DAYS_SET:
         if current_hour < DRAW_HOUR:
             hours_until = DRAW_HOUR - current_hour
             return now.strftime('%Y-%m-%d'), True, hours_until
 
-    days_ahead = 1
-    while days_ahead <= 7:
-        next_date = now + timedelta(days=days_ahead)
-        if next_date.weekday() in DRAW_DAYS:
-            draw_datetime = next_date.replace(hour=DRAW_HOUR, minute=0, second=0)
-            hours_until = (draw_datetime - now).total_seconds() / 3600
-            return next_date.strftime('%Y-%m-%d'), False, hours_until
-        days_ahead += 1
-
-    return (now + timedelta(days=1)).strftime('%Y-%m-%d'), False, 24
+    next_date = now + timedelta(days=NEXT_DRAW_DELTA[current_weekday])
+    draw_datetime = next_date.replace(hour=DRAW_HOUR, minute=0, second=0)
+    hours_until = (draw_datetime - now).total_seconds() / 3600
+    return next_date.strftime('%Y-%m-%d'), False, hours_until
 
 
 def get_next_draw_date():
@@ -415,7 +408,7 @@ if page == "🎲 Generator Tiketa":
             status_text.empty()
             progress_bar.empty()
 
-            stats = portfolio_statistics(portfolio)
+            stats = weights['portfolio_stats']
             st.success(f"✅ Generisano {len(portfolio)} tiketa!")
             st.info(f"📊 Pokrivanje parova: {stats['pair_coverage_pct']:.1f}% | "
                     f"Jedinstveni brojevi: {stats['unique_numbers']}/{MAX_NUMBER} | "
@@ -929,7 +922,7 @@ elif page == "📈 Istorija":
                 f"#{pred.prediction_id} | {pred.target_draw_date} | "
                 f"{pred.strategy_name} | {result_str}"
             ):
-                tickets = json.loads(pred.tickets)
+                tickets = pred.tickets
                 for i, ticket in enumerate(tickets, 1):
                     st.write(f"Tiket {i}: {ticket}")
 
@@ -938,9 +931,9 @@ elif page == "📈 Istorija":
                         prediction_id=pred.prediction_id
                     ).first()
                     if result:
-                        actual = json.loads(result.actual_numbers)
+                        actual = result.actual_numbers
                         st.write(f"**Izvučeni:** {actual}")
-                        matches = json.loads(result.ticket_matches)
+                        matches = result.ticket_matches
                         st.write(f"**Pogoci po tiketu:** {matches}")
     finally:
         session.close()
@@ -3,10 +3,7 @@ Generate predictions and save them for tracking
 """
 from datetime import datetime, timedelta
 from lotto_ai.features.features import build_feature_matrix, load_draws
-from lotto_ai.models.production_model import (
-    generate_adaptive_portfolio,
-    portfolio_statistics
-)
+from lotto_ai.models.production_model import generate_adaptive_portfolio
 from lotto_ai.tracking.prediction_tracker import PredictionTracker
 from lotto_ai.learning.adaptive_learner import AdaptiveLearner
 
@@ -73,7 +70,7 @@ def main():
     )
     
     # Step 6: Display results
-    stats = portfolio_statistics(portfolio)
+    stats = weights['portfolio_stats']
     
     print("\n" + "=" * 70)
     print("📦 PORTFOLIO STATISTICS")
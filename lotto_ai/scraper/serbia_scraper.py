@@ -5,13 +5,22 @@ Filters out other games (Loto Plus, Džoker, instant lotteries)
 """
 import requests
 import re
-import io
 import sys
+import tempfile
+import shutil
 import json
 import random
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from bs4 import BeautifulSoup
+from sqlalchemy import delete
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
 
 try:
     from PyPDF2 import PdfReader
@@ -22,7 +31,9 @@ if __name__ == "__main__":
     project_root = Path(__file__).parent.parent.parent
     sys.path.insert(0, str(project_root))
 
-from lotto_ai.config import logger, MAX_NUMBER, MIN_NUMBER, NUMBERS_PER_DRAW, IS_CLOUD
+from lotto_ai.config import (
+    logger, MAX_NUMBER, MIN_NUMBER, NUMBERS_PER_DRAW, IS_CLOUD, MAX_RETRIES
+)
 from lotto_ai.core.db import get_session, Draw
 
 RESULTS_URLS = [
@@ -38,9 +49,32 @@ USER_AGENTS = [
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15",
 ]
 
+# Compiled once at import; reused for every page/PDF
+_SKIP_TITLE_RE = re.compile(r'(?P<instant>извлачење\s+\d{4})|(?P<timed>време извлачења)')
+_TITLE_RE = re.compile(
+    r'Извештај\s+за\s+(\d+)\.\s*коло\s*-\s*датум\s+извлачења\s+(\d{2})\.(\d{2})\.(\d{4})'
+)
+_JS_DATA_RE = re.compile(r'var officialReportsTableData = (\[.*?\]);', re.DOTALL)
+_ROUND_RE = re.compile(r'(\d+)[\s.]*(?:редовно\s+)?(?:коло|kolo)', re.IGNORECASE)
+_URL_DATE_RE = re.compile(r'(\d{2})\.(\d{2})\.(\d{4})')
+_TEXT_DATE_RE = re.compile(r'од\s+(\d{2})\.(\d{2})\.(\d{4})')
+_NUMBER_RE = re.compile(r'\b([1-9]|[12]\d|3[0-9])\b')
+
+# PDFs up to this size stay in memory, larger ones roll over to disk
+_PDF_SPOOL_MAX_BYTES = 4 * 1024 * 1024
+_PDF_CHUNK_BYTES = 64 * 1024
+_PDF_DOWNLOAD_WORKERS = 4
+
+
+_SESSION = None
+
 
 def _get_session():
-    """Create requests session with retry"""
+    """Shared requests session with retry and keep-alive connection pool"""
+    global _SESSION
+    if _SESSION is not None:
+        return _SESSION
+
     from requests.adapters import HTTPAdapter
     from urllib3.util.retry import Retry
 
@@ -53,22 +87,24 @@ def _get_session():
         "Connection": "keep-alive",
     })
 
-    retry = Retry(total=3, backoff_factor=2, status_forcelist=[429, 500, 502, 503, 504])
-    adapter = HTTPAdapter(max_retries=retry)
+    retry = Retry(total=MAX_RETRIES, backoff_factor=2,
+                  status_forcelist=[429, 500, 502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry)
     session.mount("https://", adapter)
     session.mount("http://", adapter)
 
+    _SESSION = session
     return session
 
 
-def _fetch_page(url, timeout=30):
+def _fetch_page(url, timeout=30, stream=False):
     """Fetch page with retry"""
     session = _get_session()
 
     for t in [timeout, timeout + 15]:
         try:
             logger.debug(f"Fetching {url} (timeout={t}s)")
-            response = session.get(url, timeout=t)
+            response = session.get(url, timeout=t, stream=stream)
             response.raise_for_status()
             return response
         except (requests.exceptions.ConnectTimeout,
@@ -129,19 +165,14 @@ def scrape_results_page():
         for title_label in title_labels:
             text = title_label.get_text(strip=True)
 
-            # SKIP instant lotteries
-            if re.search(r'извлачење\s+\d{4}', text):
-                logger.debug(f"Skip instant: {text[:60]}")
-                continue
-            if 'време извлачења' in text:
-                logger.debug(f"Skip timed: {text[:60]}")
+            # SKIP instant and timed lotteries (single scan for both)
+            skip = _SKIP_TITLE_RE.search(text)
+            if skip:
+                logger.debug(f"Skip {skip.lastgroup}: {text[:60]}")
                 continue
 
             # Must match standard format
-            match = re.match(
-                r'Извештај\s+за\s+(\d+)\.\s*коло\s*-\s*датум\s+извлачења\s+(\d{2})\.(\d{2})\.(\d{4})',
-                text
-            )
+            match = _TITLE_RE.match(text)
             if not match:
                 logger.debug(f"Skip non-matching: {text[:60]}")
                 continue
@@ -512,13 +543,18 @@ def remove_bad_draws(dates_to_remove):
     session = get_session()
     removed = 0
     try:
-        for date in dates_to_remove:
-            draw = session.query(Draw).filter_by(draw_date=date).first()
-            if draw:
-                logger.info(f"Removing bad draw: {date} {draw.get_numbers()}")
-                session.delete(draw)
-                removed += 1
+        # One DELETE ... RETURNING gives back the removed rows for logging
+        bad_draws = session.execute(
+            delete(Draw)
+            .where(Draw.draw_date.in_(dates_to_remove))
+            .returning(Draw.draw_date, Draw.n1, Draw.n2, Draw.n3, Draw.n4,
+                       Draw.n5, Draw.n6, Draw.n7)
+            .execution_options(synchronize_session=False)
+        ).all()
         session.commit()
+        for draw in bad_draws:
+            logger.info(f"Removed bad draw: {draw[0]} {list(draw[1:])}")
+        removed = len(bad_draws)
         logger.info(f"Removed {removed} bad draws")
     except Exception as e:
         session.rollback()
@@ -541,13 +577,10 @@ def _scrape_from_pdfs(max_pdfs=50):
     session = get_session()
     inserted_count = 0
 
-    try:
-        for report in js_data[:max_pdfs]:
-            pdf_path = report.get('OfficialReportPath')
-            if not pdf_path:
-                continue
+    pdf_paths = [report.get('OfficialReportPath') for report in js_data[:max_pdfs]]
 
-            result = extract_numbers_from_pdf(pdf_path)
+    try:
+        for pdf_path, result in iter_pdf_results(p for p in pdf_paths if p):
             if not result:
                 continue
 
@@ -583,8 +616,7 @@ def extract_js_data():
     if not response:
         return []
     try:
-        match = re.search(r'var officialReportsTableData = (\[.*?\]);',
-                          response.text, re.DOTALL)
+        match = _JS_DATA_RE.search(response.text)
         if not match:
             return []
         return json.loads(match.group(1))
@@ -593,39 +625,111 @@ def extract_js_data():
         return []
 
 
-def extract_numbers_from_pdf(pdf_url):
-    if PdfReader is None:
-        return None
+def _extract_pdf_text(pdf_file):
+    """Extract text of all pages, preferring pdfium over PyPDF2"""
+    parts = []
+
+    if pdfium is not None:
+        doc = pdfium.PdfDocument(pdf_file)
+        try:
+            for page in doc:
+                textpage = page.get_textpage()
+                t = textpage.get_text_range()
+                textpage.close()
+                page.close()
+                if t:
+                    parts.append(t + "\n")
+        finally:
+            doc.close()
+        return "".join(parts)
 
-    response = _fetch_page(f"https://lutrija.rs{pdf_url}", timeout=20)
+    for page in PdfReader(pdf_file).pages:
+        t = page.extract_text()
+        if t:
+            parts.append(t + "\n")
+    return "".join(parts)
+
+
+def _download_pdf(pdf_url):
+    """
+    Download a report PDF into a spooled temp file.
+    Copies the raw stream instead of holding response.content plus a copy of it
+    (PDF readers need to seek, so the socket can't be parsed directly).
+    Returns the rewound file, or None on failure.
+    """
+    response = _fetch_page(f"https://lutrija.rs{pdf_url}", timeout=20, stream=True)
     if not response:
         return None
 
+    spool = tempfile.SpooledTemporaryFile(max_size=_PDF_SPOOL_MAX_BYTES)
     try:
-        reader = PdfReader(io.BytesIO(response.content))
-        text = ""
-        for page in reader.pages:
-            t = page.extract_text()
-            if t:
-                text += t + "\n"
+        with response:
+            response.raw.decode_content = True
+            shutil.copyfileobj(response.raw, spool, _PDF_CHUNK_BYTES)
+    except Exception as e:
+        spool.close()
+        logger.error(f"PDF download error: {e}")
+        return None
 
-        round_number = None
-        for pattern in [r'(\d+)[\s.]*(?:редовно\s+)?(?:коло|kolo)']:
-            m = re.search(pattern, pdf_url, re.IGNORECASE) or \
-                re.search(pattern, text, re.IGNORECASE)
-            if m:
-                round_number = int(m.group(1))
+    spool.seek(0)
+    return spool
+
+
+def iter_pdf_results(pdf_urls, max_workers=_PDF_DOWNLOAD_WORKERS):
+    """
+    Yield (pdf_url, result) for each report PDF, in input order.
+
+    Downloads run ahead on a small thread pool (network bound); parsing
+    stays on the calling thread because pdfium is not thread-safe.
+    """
+    urls = iter(pdf_urls)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = deque()
+        for url in urls:
+            pending.append((url, pool.submit(_download_pdf, url)))
+            if len(pending) >= max_workers * 2:
                 break
+
+        while pending:
+            url, future = pending.popleft()
+            next_url = next(urls, None)
+            if next_url is not None:
+                pending.append((next_url, pool.submit(_download_pdf, next_url)))
+
+            pdf_file = future.result()
+            if pdf_file is None:
+                yield url, None
+            else:
+                yield url, extract_numbers_from_pdf(url, pdf_file=pdf_file)
+
+
+def extract_numbers_from_pdf(pdf_url, pdf_file=None):
+    if pdfium is None and PdfReader is None:
+        return None
+
+    if pdf_file is None:
+        pdf_file = _download_pdf(pdf_url)
+        if pdf_file is None:
+            return None
+
+    try:
+        with pdf_file:
+            text = _extract_pdf_text(pdf_file)
+
+        round_number = None
+        m = _ROUND_RE.search(pdf_url) or _ROUND_RE.search(text)
+        if m:
+            round_number = int(m.group(1))
         if not round_number:
             return None
 
         draw_date = None
-        m = re.search(r'(\d{2})\.(\d{2})\.(\d{4})', pdf_url)
+        m = _URL_DATE_RE.search(pdf_url)
         if m:
             d, mo, y = m.groups()
             draw_date = f"{y}-{mo}-{d}"
         if not draw_date:
-            m = re.search(r'од\s+(\d{2})\.(\d{2})\.(\d{4})', text[:500])
+            m = _TEXT_DATE_RE.search(text, 0, 500)
             if m:
                 d, mo, y = m.groups()
                 draw_date = f"{y}-{mo}-{d}"
@@ -634,7 +738,7 @@ def extract_numbers_from_pdf(pdf_url):
 
         sections = text.split('ЏОКЕР')
         early = sections[0][:800] if len(sections) > 1 else text[:800]
-        all_nums = re.findall(r'\b([1-9]|[12]\d|3[0-9])\b', early)
+        all_nums = _NUMBER_RE.findall(early)
 
         seen = []
         for s in all_nums:
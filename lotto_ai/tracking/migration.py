@@ -101,8 +101,8 @@ def migrate_old_predictions():
                 strategy_name=row[3],
                 model_version=row[4],
                 portfolio_size=row[5],
-                tickets=row[6],
-                model_metadata=row[7] or '{}',
+                tickets=json.loads(row[6]),
+                model_metadata=json.loads(row[7]) if row[7] else {},
                 evaluated=bool(row[8]) if row[8] is not None else False
             )
             session.add(pred)
@@ -121,12 +121,13 @@ def migrate_old_predictions():
                 for result_row in cur.fetchall():
                     result = PredictionResult(
                         prediction_id=pred.prediction_id,
-                        actual_numbers=result_row[0],
+                        actual_numbers=json.loads(result_row[0]),
                         evaluated_at=result_row[1],
                         best_match=result_row[2],
                         total_matches=result_row[3],
                         prize_value=result_row[4],
-                        ticket_matches=result_row[5]
+                        ticket_matches=(json.loads(result_row[5])
+                                        if result_row[5] else None)
                     )
                     session.add(result)
 
@@ -8,7 +8,7 @@ from datetime import datetime
 
 sys.path.insert(0, str(Path(__file__).parent))
 
-from lotto_ai.scraper.serbia_scraper import extract_js_data, extract_numbers_from_pdf
+from lotto_ai.scraper.serbia_scraper import extract_js_data, iter_pdf_results
 from lotto_ai.core.db import get_session, Draw, init_db
 from lotto_ai.config import logger, NUMBER_RANGE
 
@@ -49,13 +49,12 @@ def scrape_all_with_progress():
 
     min_num, max_num = NUMBER_RANGE
 
-    try:
-        for i, report in enumerate(js_data, 1):
-            pdf_path = report.get('OfficialReportPath')
-            if not pdf_path:
-                stats['failed'] += 1
-                continue
+    pdf_paths = [report.get('OfficialReportPath') for report in js_data]
+    stats['failed'] += sum(1 for p in pdf_paths if not p)
 
+    try:
+        results = iter_pdf_results(p for p in pdf_paths if p)
+        for i, (pdf_path, result) in enumerate(results, 1):
             if i % 10 == 0 or i == 1:
                 elapsed = time.time() - stats['start_time']
                 rate = i / elapsed if elapsed > 0 else 0
@@ -68,7 +67,6 @@ def scrape_all_with_progress():
                     f"⏱️  ETA: {eta / 60:.1f} min"
                 )
 
-            result = extract_numbers_from_pdf(pdf_path)
             stats['processed'] += 1
 
             if not result:
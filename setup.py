@@ -15,6 +15,7 @@ setup(
         'requests>=2.31.0',
         'beautifulsoup4>=4.12.0',
         'PyPDF2>=3.0.0',
+        'pypdfium2>=4.0',
         'python-dateutil>=2.8.2',
     ]
 )
\ No newline at end of file